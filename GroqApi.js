@@ -18,9 +18,9 @@ const groq = new Groq({
 function resolveGroqModel() {
     // Map deprecated/alias model names to supported ones
     const aliasMap = {
-        'llama3-70b-8192': 'llama-3.1-70b-versatile',
+        'llama3-70b-8192': 'llama-3.3-70b-versatile',
         'llama3-8b-8192': 'llama-3.1-8b-instant',
-        'llama3-70b': 'llama-3.1-70b-versatile',
+        'llama3-70b': 'llama-3.3-70b-versatile',
         'llama3-8b': 'llama-3.1-8b-instant',
     };
     const envModel = process.env.GROQ_MODEL;
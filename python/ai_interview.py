@@ -1,623 +1,1090 @@
 import argparse
+import asyncio
+import atexit
+import functools
 import json
 import os
 import random
-from typing import List, Dict, Any
+import re
+import signal
+import string
+import sys
+import textwrap
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypedDict, Union
 
-from langgraph.graph import StateGraph
+import groq
+import httpx
 from langchain_groq import ChatGroq
-from langchain.prompts import ChatPromptTemplate
-import json
 
-from typing import TypedDict
+import groq_limits
+import llm_cache
+from mcq_stream import McqStreamParser
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encode/decode
+    orjson = None
+
 
 class InterviewState(TypedDict, total=False):
+    """State passed between the pipeline steps (type hints only)."""
     resume_text: str
     job_desc: str
-    # New fields for topic-based pipeline
+    target_role: str
+    experience: str
+    round: str
     easy_topic_skills: List[str]
     hard_topic_skills: List[str]
     selected_easy_topics: List[str]
     selected_hard_topics: List[str]
     prev_used_hard_topics: List[str]
-    target_role: str
-    experience: str
+    remaining_hard_topics: List[str]
     questions: Dict[str, Any]
 
 
-def _resolve_groq_model() -> str:
+# Known decommissioned/old aliases -> current recommended equivalents
+_MODEL_ALIASES = {
+    "llama3-70b-8192": "llama-3.3-70b-versatile",
+    "llama3-8b-8192": "llama-3.1-8b-instant",
+    "llama3-70b": "llama-3.3-70b-versatile",
+    "llama3-8b": "llama-3.1-8b-instant",
+}
+
+
+def _resolve_groq_model(round_type: Optional[str] = None) -> str:
     """Return a supported Groq model name, remapping deprecated aliases if needed.
-    Honors the GROQ_MODEL env var if present, else defaults to a safe current model.
+    Honors GROQ_MODEL_<ROUND_TYPE> (e.g. GROQ_MODEL_TECHNICAL_ROUND2 to give one round a
+    larger model) and then the GROQ_MODEL env var if present, else a safe current default.
     """
-    # Known decommissioned/old aliases -> current recommended equivalents
-    alias_map = {
-        "llama3-70b-8192": "llama-3.1-70b-versatile",
-        "llama3-8b-8192": "llama-3.1-8b-instant",
-        "llama3-70b": "llama-3.1-70b-versatile",
-        "llama3-8b": "llama-3.1-8b-instant",
-    }
-    env_model = os.getenv("GROQ_MODEL")
+    env_model = (os.getenv(f"GROQ_MODEL_{round_type.upper()}") if round_type else None) or os.getenv("GROQ_MODEL")
     if env_model:
-        return alias_map.get(env_model, env_model)
+        return _MODEL_ALIASES.get(env_model, env_model)
     # Default to a currently supported model
     return "llama-3.1-8b-instant"
 
 
-def build_graph(round_type: str = "technical_round1") -> StateGraph:
-    """Return a compiled LangGraph that produces interview questions for different rounds."""
-    # Ensure the API key is set; fallback to env variable
+# Output contract shared by every round prompt (appended below)
+_OUTPUT_FORMAT = """# OUTPUT FORMAT: respond with only this JSON object, no prose or markdown.
+{{"mcq_questions": [{{"question": "...", "options": {{"A": "...", "B": "...", "C": "...", "D": "..."}}, "answer": "A"}}], "desc_questions": ["...", "...", "..."]}}
+"""
+
+# Define different prompts for different rounds (now topic-aware)
+_ROUND_PROMPTS = {
+    "technical_round1": """
+    # ROLE: You are an expert Technical Interviewer and Question Architect. Your persona is a Senior Engineer tasked with creating a fair and effective screening interview.
+    # OBJECTIVE: Generate a set of 8 interview questions for a "Technical Round 1" based on the provided skill topics, candidate resume, and job description.
+
+    # STRICT GUIDELINES:
+    1. Question Distribution & Topic Adherence:
+       - Generate exactly 5 Multiple-Choice Questions (MCQs) and 3 Descriptive Questions.
+       - MCQs: Create 4 questions from the 'Easy Difficulty' topics and 1 question from the 'Hard Difficulty' topic.
+       - Descriptive Questions: Create 2 questions from the 'Easy Difficulty' topics and 1 challenging, in-depth question from the 'Hard Difficulty' topic.
+       - CRITICAL: Do NOT ask about any topic or skill NOT listed in the FOCUSED SKILL TOPICS.
+    2. Contextual Tailoring:
+       - Subtly tailor the questions to be relevant to the candidate's experience in the CANDIDATE RESUME and the requirements in the JOB DESCRIPTION.
+       - For example, frame a question around a project or technology mentioned in their resume.
+    3. Quality Standards:
+       - MCQs: Ensure there are four distinct options (A, B, C, D) with only one unambiguously correct answer. The incorrect options should be plausible distractors.
+       - Descriptive Questions: Assess thought process, problem-solving, and depth of knowledge.
+
+    """,
+
+    "technical_round2": """
+    # ROLE: You are a Principal Engineer or Tech Lead. Your task is to conduct a deep-dive technical interview (Round 2) to rigorously assess a candidate's expert-level knowledge and problem-solving abilities.
+    # OBJECTIVE: Generate a highly challenging set of 8 interview questions. This round must be significantly more difficult than a preliminary screening and should focus on architectural thinking, trade-off analysis, and practical application of advanced concepts.
+
+    # STRICT GUIDELINES:
+    1. Difficulty Level: EXPERT
+       - Move beyond definitional questions. Focus on "How would you design...", "What are the trade-offs between...", and "Why would you choose X over Y in a scenario like..."
+       - Questions must probe deep understanding of underlying principles.
+    2. Question Composition
+       - Advanced MCQs (5 total): test nuanced understanding of complex topics. Incorrect options must be subtle misconceptions or suboptimal solutions.
+       - Problem-Solving Scenarios (3 total): mini case studies/design challenges requiring the candidate to architect a solution, debug a complex issue, or justify architectural decisions.
+    3. Strict Topic Adherence
+       - Base ALL questions strictly on ADVANCED SKILL TOPICS.
+       - CRITICAL: Do NOT ask about any topic listed in TOPICS TO AVOID.
+    4. Contextual Scenarios
+       - Use the candidate resume and job description to craft realistic, role-relevant problems (e.g., scale to millions of users, align with domain/constraints).
+
+    """,
+
+    "managerial_round": """
+    # ROLE: You are a seasoned Director or VP of Engineering. You are interviewing a candidate for a leadership position and need to assess their people management skills, strategic thinking, and emotional intelligence.
+    # OBJECTIVE: Generate a set of sophisticated behavioral and situational judgment questions for a final-round Managerial Interview. The questions must evaluate the candidate's leadership potential and alignment with modern management practices.
+
+    # STRICT GUIDELINES:
+    1. Seniority Calibration (Crucial):
+       - Adjust scope and complexity based on years of experience.
+       - For junior managers/leads (< 5 years): focus on team-level challenges, direct-report performance, and project execution.
+       - For senior managers/directors (> 10 years): focus on cross-functional strategy, managing other managers, org design, and ambiguity.
+    2. Question Focus:
+       - Questions must be strictly about leadership, strategy, and people management.
+       - CRITICAL: Do NOT generate questions about individual coding tasks, technical system design, or specific technologies.
+    3. MCQ Scenario Design:
+       - Generate 5 MCQ questions. Each MCQ should be a realistic managerial dilemma.
+       - Options (A–D) should represent distinct, plausible management approaches (e.g., passive, authoritarian, collaborative/empowering, etc.). Mark as correct the option best aligned with modern leadership principles.
+    4. Descriptive Question Theming:
+       - Generate 3 descriptive, open-ended questions.
+       - Each must probe a different core leadership theme. Choose three distinct themes from:
+         1) Conflict Resolution & Communication
+         2) Performance Management & Coaching
+         3) Strategic Planning & Prioritization
+         4) Stakeholder Management & Influence
+         5) Leading Through Change & Ambiguity
+       - Frame the questions to encourage storytelling using the STAR method (Situation, Task, Action, Result).
+
+    """,
+
+    "hr_round": """
+    # ROLE: You are an experienced HR Business Partner. Your role is to assess a candidate's motivation, self-awareness, collaborative spirit, and overall alignment with a healthy and productive workplace culture.
+    # OBJECTIVE: Generate a set of classic HR interview questions for a final screening round. The questions should be designed to understand the candidate's past behaviors, future ambitions, and interpersonal skills.
+
+    # STRICT GUIDELINES:
+    1. Assessment Focus:
+       - Evaluate across four key areas:
+         1) Motivation & Ambition
+         2) Collaboration & Teamwork
+         3) Self-Awareness & Growth
+         4) Resilience & Professionalism
+    2. MCQ Design (Situational Judgment):
+       - Generate 5 MCQ questions, each a common workplace scenario testing professional judgment.
+       - Options (A–D) must reflect different reactions (e.g., proactive, passive, overly individualistic, collaborative). The best answer reflects maturity, ownership, and a team-oriented mindset.
+    3. Descriptive Question Theming:
+       - Generate 3 classic, open-ended questions; each targets a different area from the four above. Examples include:
+         - Motivation & Ambition: "Why this company?", "Where do you see yourself in 5 years?"
+         - Collaboration & Teamwork: "Tell me about a time you disagreed with a teammate."
+         - Self-Awareness & Growth: "What is your greatest weakness?", "Describe a time you received difficult feedback."
+    4. General Rules:
+       - CRITICAL: Do NOT ask any technical questions or day-to-day role-specific tasks.
+       - Use clear, simple, and universally understood HR language.
+
+    """,
+
+}
+
+# Per-candidate inputs for each round; kept after the static instructions (see below)
+_PROFILE_INPUTS = """
+    # CONTEXTUAL INPUTS:
+    1. CANDIDATE PROFILE:
+       - Target Role: {target_role}
+       - Years of Experience: {experience}
+    2. JOB DESCRIPTION (for organizational context): {job_desc}
+    3. CANDIDATE RESUME: {resume_text}
+    """
+
+_ROUND_INPUTS = {
+    "technical_round1": """
+    # CONTEXTUAL INPUTS:
+    1. FOCUSED SKILL TOPICS:
+       - Easy Difficulty (4 topics): {selected_easy_topics}
+       - Hard Difficulty (1 topic): {selected_hard_topics}
+    2. JOB DESCRIPTION: {job_desc}
+    3. CANDIDATE RESUME: {resume_text}
+    """,
+    "technical_round2": """
+    # CONTEXTUAL INPUTS:
+    1. ADVANCED SKILL TOPICS: {remaining_hard_topics}
+    2. TOPICS TO AVOID (Covered in Round 1): {prev_used_hard_topics}
+    3. JOB DESCRIPTION: {job_desc}
+    4. CANDIDATE RESUME: {resume_text}
+    """,
+    "managerial_round": _PROFILE_INPUTS,
+    "hr_round": _PROFILE_INPUTS,
+}
+
+# Everything identical across candidates (instructions, output schema) comes first and the
+# per-candidate inputs last, so Groq's prompt-prefix cache can reuse the shared prefix.
+# Dedent once so indentation is not sent (and billed) on every line
+_ROUND_INSTRUCTIONS = {k: textwrap.dedent(v).strip() for k, v in _ROUND_PROMPTS.items()}
+_ROUND_INPUTS = {k: textwrap.dedent(v).strip() for k, v in _ROUND_INPUTS.items()}
+_ROUND_PROMPTS = {k: f"{v}\n\n{_OUTPUT_FORMAT}---\n{_ROUND_INPUTS[k]}" for k, v in _ROUND_INSTRUCTIONS.items()}
+# Per-round task text for the batched prompt, which adds its own output format
+_ROUND_TASKS = {k: f"{v}\n\n{_ROUND_INPUTS[k]}" for k, v in _ROUND_INSTRUCTIONS.items()}
+
+# Batched variant: all four rounds' instructions in one request, with the resume and job
+# description sent once at the end instead of once per round.
+_BATCH_HEADER = (
+    "You are preparing a four-round interview for one candidate. Complete each task below "
+    "independently, following its own guidelines.\n\n"
+)
+_BATCH_CONTEXT_REFS = {
+    "resume_text": "(see CANDIDATE RESUME at the end)",
+    "job_desc": "(see JOB DESCRIPTION at the end)",
+}
+_BATCH_OUTPUT_FORMAT = (
+    "# OUTPUT FORMAT: respond with only this JSON object, no prose or markdown. "
+    "Each round has the same shape:\n"
+    '{"technical_round1": {"mcq_questions": [{"question": "...", "options": {"A": "...", "B": "...", '
+    '"C": "...", "D": "..."}, "answer": "A"}], "desc_questions": ["...", "...", "..."]}, '
+    '"technical_round2": {...}, "managerial_round": {...}, "hr_round": {...}}\n'
+)
+
+
+_TOPIC_EXTRACTION_PROMPT = """
+You are a resume topic mining assistant. Read the ENTIRE resume content below (skills, projects, work experience, summary, certifications, any other sections) and extract two arrays:
+1) easy_topic_skills: up to 10 topics that are foundational/common for the candidate based on resume content
+2) hard_topic_skills: up to 5 topics that are advanced/deep or complex according to the resume content
+
+Rules:
+- Deduplicate and normalize topic names (short, canonical terms)
+- Consider the full resume, not just a skills list
+- Do not invent technologies that aren't implied by the resume
+- Keep the limits strictly: easy max 10, hard max 5
+
+Return STRICT JSON only in this format:
+{{
+  "easy_topic_skills": ["..."],
+  "hard_topic_skills": ["..."]
+}}
+
+RESUME TEXT:
+{resume_text}
+"""
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    except ImportError:
+        return False
+    return True
+
+
+# One connection pool per process shared by every ChatGroq instance (all models, JD
+# generation included), so requests reuse the same TLS connection to api.groq.com.
+# With h2 installed, concurrent round requests multiplex over a single HTTP/2 connection.
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=16, keepalive_expiry=60.0)
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+_HTTP_CLIENT = httpx.Client(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT, http2=_http2_available())
+_HTTP_ASYNC_CLIENT = httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT, http2=_http2_available())
+
+
+# Output budget per call, sized from the expected JSON (5 MCQs + 3 descriptive questions;
+# round 2 scenarios run longer). A response cut off at the budget is retried once with
+# double the budget. Calls not listed use the client default.
+_MAX_TOKENS = {
+    "topic_extraction": 400,
+    "technical_round1": 1200,
+    "technical_round2": 1800,
+    "managerial_round": 1000,
+    "hr_round": 900,
+}
+_DEFAULT_MAX_TOKENS = 2048
+
+
+# Generated text (questions, job descriptions) is sampled so repeat sessions get varied
+# questions; extraction-style calls (topics, resume summary) run at temperature 0.
+_SAMPLED_TEMPERATURE = 0.7
+
+
+@functools.lru_cache(maxsize=None)
+def _get_llm(model_name: str, temperature: float = 0) -> ChatGroq:
+    """Return a process-wide ChatGroq client for (model_name, temperature).
+
+    All clients share the module-level HTTP pools, keeping connections warm across calls.
+    """
     if "GROQ_API_KEY" not in os.environ:
         raise RuntimeError("GROQ_API_KEY environment variable is not set.")
+    return ChatGroq(
+        temperature=temperature,
+        model_name=model_name,
+        max_tokens=_DEFAULT_MAX_TOKENS,
+        http_client=_HTTP_CLIENT,
+        http_async_client=_HTTP_ASYNC_CLIENT,
+        # The SDK retries 429/5xx with exponential backoff, honoring Retry-After
+        max_retries=3,
+    )
 
-    llm = ChatGroq(temperature=0.7, model_name=_resolve_groq_model(), max_tokens=2048)
-    
-    # Define different prompts for different rounds (now topic-aware)
-    prompts = {
-        "technical_round1": """
-        # ROLE: You are an expert Technical Interviewer and Question Architect. Your persona is a Senior Engineer tasked with creating a fair and effective screening interview.
-        # OBJECTIVE: Generate a set of 8 interview questions for a "Technical Round 1" based on the provided skill topics, candidate resume, and job description.
-
-        # CONTEXTUAL INPUTS:
-        1. FOCUSED SKILL TOPICS:
-           - Easy Difficulty (4 topics): {selected_easy_topics}
-           - Hard Difficulty (1 topic): {selected_hard_topics}
-        2. CANDIDATE RESUME: {resume_text}
-        3. JOB DESCRIPTION: {job_desc}
-
-        # STRICT GUIDELINES:
-        1. Question Distribution & Topic Adherence:
-           - Generate exactly 5 Multiple-Choice Questions (MCQs) and 3 Descriptive Questions.
-           - MCQs: Create 4 questions from the 'Easy Difficulty' topics and 1 question from the 'Hard Difficulty' topic.
-           - Descriptive Questions: Create 2 questions from the 'Easy Difficulty' topics and 1 challenging, in-depth question from the 'Hard Difficulty' topic.
-           - CRITICAL: Do NOT ask about any topic or skill NOT listed in the FOCUSED SKILL TOPICS.
-        2. Contextual Tailoring:
-           - Subtly tailor the questions to be relevant to the candidate's experience in the CANDIDATE RESUME and the requirements in the JOB DESCRIPTION.
-           - For example, frame a question around a project or technology mentioned in their resume.
-        3. Quality Standards:
-           - MCQs: Ensure there are four distinct options (A, B, C, D) with only one unambiguously correct answer. The incorrect options should be plausible distractors.
-           - Descriptive Questions: Assess thought process, problem-solving, and depth of knowledge.
-
-        # OUTPUT FORMAT:
-        - Your entire response MUST be a single, valid JSON object.
-        - Do NOT include any text, explanations, or markdown formatting before or after the JSON structure.
-        {{
-          "mcq_questions": [
-            {{ "question": "...", "options": {{ "A": "...", "B": "...", "C": "...", "D": "..." }}, "answer": "A" }}
-          ],
-          "desc_questions": [ "...", "...", "..." ]
-        }}
-        """,
-        
-        "technical_round2": """
-        # ROLE: You are a Principal Engineer or Tech Lead. Your task is to conduct a deep-dive technical interview (Round 2) to rigorously assess a candidate's expert-level knowledge and problem-solving abilities.
-        # OBJECTIVE: Generate a highly challenging set of 8 interview questions. This round must be significantly more difficult than a preliminary screening and should focus on architectural thinking, trade-off analysis, and practical application of advanced concepts.
-
-        # CONTEXTUAL INPUTS:
-        1. ADVANCED SKILL TOPICS: {remaining_hard_topics}
-        2. TOPICS TO AVOID (Covered in Round 1): {prev_used_hard_topics}
-        3. CANDIDATE RESUME: {resume_text}
-        4. JOB DESCRIPTION: {job_desc}
-
-        # STRICT GUIDELINES:
-        1. Difficulty Level: EXPERT
-           - Move beyond definitional questions. Focus on "How would you design...", "What are the trade-offs between...", and "Why would you choose X over Y in a scenario like..."
-           - Questions must probe deep understanding of underlying principles.
-        2. Question Composition
-           - Advanced MCQs (5 total): test nuanced understanding of complex topics. Incorrect options must be subtle misconceptions or suboptimal solutions.
-           - Problem-Solving Scenarios (3 total): mini case studies/design challenges requiring the candidate to architect a solution, debug a complex issue, or justify architectural decisions.
-        3. Strict Topic Adherence
-           - Base ALL questions strictly on ADVANCED SKILL TOPICS.
-           - CRITICAL: Do NOT ask about any topic listed in TOPICS TO AVOID.
-        4. Contextual Scenarios
-           - Use the candidate resume and job description to craft realistic, role-relevant problems (e.g., scale to millions of users, align with domain/constraints).
-
-        # OUTPUT FORMAT:
-        - Your entire response MUST be a single, valid JSON object.
-        - Do NOT include any text, explanations, or markdown formatting before or after the JSON structure.
-        {{
-          "mcq_questions": [
-            {{ "question": "...", "options": {{ "A": "...", "B": "...", "C": "...", "D": "..." }}, "answer": "A" }}
-          ],
-          "desc_questions": [ "...", "...", "..." ]
-        }}
-        """,
-
-        "managerial_round": """
-        # ROLE: You are a seasoned Director or VP of Engineering. You are interviewing a candidate for a leadership position and need to assess their people management skills, strategic thinking, and emotional intelligence.
-        # OBJECTIVE: Generate a set of sophisticated behavioral and situational judgment questions for a final-round Managerial Interview. The questions must evaluate the candidate's leadership potential and alignment with modern management practices.
-
-        # CONTEXTUAL INPUTS:
-        1. CANDIDATE RESUME: {resume_text}
-        2. JOB DESCRIPTION (for organizational context): {job_desc}
-        3. CANDIDATE PROFILE:
-           - Target Role: {target_role}
-           - Years of Experience: {experience}
-
-        # STRICT GUIDELINES:
-        1. Seniority Calibration (Crucial):
-           - Adjust scope and complexity based on years of experience.
-           - For junior managers/leads (< 5 years): focus on team-level challenges, direct-report performance, and project execution.
-           - For senior managers/directors (> 10 years): focus on cross-functional strategy, managing other managers, org design, and ambiguity.
-        2. Question Focus:
-           - Questions must be strictly about leadership, strategy, and people management.
-           - CRITICAL: Do NOT generate questions about individual coding tasks, technical system design, or specific technologies.
-        3. MCQ Scenario Design:
-           - Generate 5 MCQ questions. Each MCQ should be a realistic managerial dilemma.
-           - Options (A–D) should represent distinct, plausible management approaches (e.g., passive, authoritarian, collaborative/empowering, etc.). Mark as correct the option best aligned with modern leadership principles.
-        4. Descriptive Question Theming:
-           - Generate 3 descriptive, open-ended questions.
-           - Each must probe a different core leadership theme. Choose three distinct themes from:
-             1) Conflict Resolution & Communication
-             2) Performance Management & Coaching
-             3) Strategic Planning & Prioritization
-             4) Stakeholder Management & Influence
-             5) Leading Through Change & Ambiguity
-           - Frame the questions to encourage storytelling using the STAR method (Situation, Task, Action, Result).
-
-        # OUTPUT FORMAT:
-        - Your entire response MUST be a single, valid JSON object.
-        - Do NOT include any text, explanations, or markdown formatting before or after the JSON structure.
-        {{
-          "mcq_questions": [
-            {{ "question": "...", "options": {{ "A": "...", "B": "...", "C": "...", "D": "..." }}, "answer": "A" }}
-          ],
-          "desc_questions": [ "...", "...", "..." ]
-        }}
-        """,
-
-        "hr_round": """
-        # ROLE: You are an experienced HR Business Partner. Your role is to assess a candidate's motivation, self-awareness, collaborative spirit, and overall alignment with a healthy and productive workplace culture.
-        # OBJECTIVE: Generate a set of classic HR interview questions for a final screening round. The questions should be designed to understand the candidate's past behaviors, future ambitions, and interpersonal skills.
-
-        # CONTEXTUAL INPUTS:
-        1. CANDIDATE RESUME: {resume_text}
-        2. JOB DESCRIPTION (for organizational context): {job_desc}
-        3. CANDIDATE PROFILE:
-           - Target Role: {target_role}
-           - Years of Experience: {experience}
-
-        # STRICT GUIDELINES:
-        1. Assessment Focus:
-           - Evaluate across four key areas:
-             1) Motivation & Ambition
-             2) Collaboration & Teamwork
-             3) Self-Awareness & Growth
-             4) Resilience & Professionalism
-        2. MCQ Design (Situational Judgment):
-           - Generate 5 MCQ questions, each a common workplace scenario testing professional judgment.
-           - Options (A–D) must reflect different reactions (e.g., proactive, passive, overly individualistic, collaborative). The best answer reflects maturity, ownership, and a team-oriented mindset.
-        3. Descriptive Question Theming:
-           - Generate 3 classic, open-ended questions; each targets a different area from the four above. Examples include:
-             - Motivation & Ambition: "Why this company?", "Where do you see yourself in 5 years?"
-             - Collaboration & Teamwork: "Tell me about a time you disagreed with a teammate."
-             - Self-Awareness & Growth: "What is your greatest weakness?", "Describe a time you received difficult feedback."
-        4. General Rules:
-           - CRITICAL: Do NOT ask any technical questions or day-to-day role-specific tasks.
-           - Use clear, simple, and universally understood HR language.
-
-        # OUTPUT FORMAT:
-        - Your entire response MUST be a single, valid JSON object.
-        - Do NOT include any text, explanations, or markdown formatting before or after the JSON structure.
-        {{
-          "mcq_questions": [
-            {{ "question": "...", "options": {{ "A": "...", "B": "...", "C": "...", "D": "..." }}, "answer": "A" }}
-          ],
-          "desc_questions": [ "...", "...", "..." ]
-        }}
-        """,
-        
-    }
-    
-    prompt_template = prompts.get(round_type, prompts["technical_round1"])
-    prompt = ChatPromptTemplate.from_template(prompt_template)
 
-    def _safe_json(text: str):
-        try:
-            if "```" in text:
-                # try to extract fenced JSON
-                parts = text.split("```")
-                for p in parts:
-                    p = p.strip()
-                    if p.startswith("{") or p.startswith("["):
-                        return json.loads(p)
-            return json.loads(text)
-        except Exception:
-            return None
+def _has_questions(data: Any) -> bool:
+    return isinstance(data, dict) and "mcq_questions" in data and "desc_questions" in data
 
-    def topic_extraction(state: dict):
-        """Agent 1: Extract easy and hard topic skills from the ENTIRE resume (all sections)."""
-        extract_prompt = ChatPromptTemplate.from_template(
-            """
-            You are a resume topic mining assistant. Read the ENTIRE resume content below (skills, projects, work experience, summary, certifications, any other sections) and extract two arrays:
-            1) easy_topic_skills: up to 10 topics that are foundational/common for the candidate based on resume content
-            2) hard_topic_skills: up to 5 topics that are advanced/deep or complex according to the resume content
-
-            Rules:
-            - Deduplicate and normalize topic names (short, canonical terms)
-            - Consider the full resume, not just a skills list
-            - Do not invent technologies that aren't implied by the resume
-            - Keep the limits strictly: easy max 10, hard max 5
-
-            Return STRICT JSON only in this format:
-            {{
-              "easy_topic_skills": ["..."],
-              "hard_topic_skills": ["..."]
-            }}
-
-            RESUME TEXT:
-            {resume_text}
-            """
-        )
-        result = llm.predict(extract_prompt.format(resume_text=state.get("resume_text", "")))
-        data = _safe_json(result) or {}
-        easy = (data.get("easy_topic_skills") or [])[:10]
-        hard = (data.get("hard_topic_skills") or [])[:5]
-        state["easy_topic_skills"] = easy
-        state["hard_topic_skills"] = hard
-        return state
 
-    def topic_selection(state: dict):
-        """Agent 2: Select topics per round:
-        - Round 1: pick 4 random easy topics and 1 random hard topic
-        - Round 2: use all remaining hard topics excluding previously used hard topics
-        """
-        easy = state.get("easy_topic_skills", []) or []
-        hard = state.get("hard_topic_skills", []) or []
-        prev = state.get("prev_used_hard_topics", []) or []
+# Groq service tier per call. JD generation runs off the critical path (and is cached),
+# so it takes the cheaper best-effort flex tier; technical_round2 is the slowest
+# user-visible call, so it asks for the performance tier. Override with
+# GROQ_SERVICE_TIER_<NAME> (empty string = account default).
+_SERVICE_TIERS = {
+    "job_description": "flex",
+    "technical_round2": "performance",
+}
+# Flex capacity / rate-limit responses worth retrying on the same tier
+_TIER_RETRY_STATUSES = (429, 498, 503)
+_TIER_RETRIES = 3
 
-        try:
-            round_num = int(state.get("round", "1"))
-        except Exception:
-            round_num = 1
-
-        if round_num == 1:
-            sel_easy = random.sample(easy, k=min(4, len(easy))) if easy else []
-            sel_hard = random.sample(hard, k=min(1, len(hard))) if hard else []
-            state["selected_easy_topics"] = sel_easy
-            state["selected_hard_topics"] = sel_hard
-        elif round_num == 2:
-            remaining_hard = [h for h in hard if h not in prev]
-            state["remaining_hard_topics"] = remaining_hard
-            state["selected_easy_topics"] = []
-            state["selected_hard_topics"] = remaining_hard[:]  # for consistency in output
-        else:
-            # Other rounds don't use topic selection
-            state["selected_easy_topics"] = []
-            state["selected_hard_topics"] = []
-        return state
 
-    def skill_sampling(state: dict):
-        """Agent 2.5: randomly sample a fixed count of matched and unmatched skills for question generation."""
-        matched = state.get("matched_skills", []) or []
-        unmatched = state.get("unmatched_skills", []) or []
-        ms = state.get("matched_sample_size")
-        us = state.get("unmatched_sample_size")
-        # Defaults if not provided
-        if not isinstance(ms, int) or ms <= 0:
-            ms = 3
-        if not isinstance(us, int) or us <= 0:
-            us = 2
-        sampled_matched = random.sample(matched, k=min(ms, len(matched))) if matched else []
-        sampled_unmatched = random.sample(unmatched, k=min(us, len(unmatched))) if unmatched else []
-        state["matched_sample_size"] = ms
-        state["unmatched_sample_size"] = us
-        state["sampled_matched_skills"] = sampled_matched
-        state["sampled_unmatched_skills"] = sampled_unmatched
-        return state
+def _service_tier(name: str) -> Optional[str]:
+    return os.getenv(f"GROQ_SERVICE_TIER_{name.upper()}", _SERVICE_TIERS.get(name)) or None
+
+
+def _tier_retry_delay(exc: Exception, tier: str, attempt: int) -> Optional[float]:
+    """Decide what to do after a call on a non-default tier failed.
+
+    Returns seconds to wait before retrying on the same tier, or None to fall back to the
+    account default tier. Errors that have nothing to do with the tier are re-raised.
+    """
+    status = getattr(exc, "status_code", None)
+    if status in _TIER_RETRY_STATUSES:
+        if tier == "flex" and attempt + 1 < _TIER_RETRIES:
+            return 0.5 * 2 ** attempt
+        return None
+    if status in (400, 403):
+        # Tier not enabled for this account/model
+        return None
+    raise exc
+
+
+async def _ainvoke(llm: ChatGroq, prompt_text: str, tier: Optional[str] = None, **kwargs: Any) -> str:
+    """(await llm.ainvoke(prompt_text)).content, sent on the given service tier when set."""
+    if tier:
+        for attempt in range(_TIER_RETRIES):
+            try:
+                return (await llm.ainvoke(prompt_text, service_tier=tier, **kwargs)).content
+            except groq.APIStatusError as e:
+                delay = _tier_retry_delay(e, tier, attempt)
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+    return (await llm.ainvoke(prompt_text, **kwargs)).content
+
+
+# Groq JSON mode for non-streaming calls whose prompt asks for a JSON object.
+# (Not used with llm.stream, which JSON mode does not support.)
+_JSON_MODE = {"response_format": {"type": "json_object"}}
+
+
+def _json_loads(text: str) -> Any:
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def _json_dumps(obj: Any) -> str:
+    # Compact UTF-8 either way, so prompts (and their cache keys) match with or without orjson
+    return orjson.dumps(obj).decode() if orjson is not None else json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
 
-    def generate_questions(state: dict):
-        # For technical rounds, ensure proper prompt variables are present
+def _write_json(obj: Any) -> None:
+    """Write obj to stdout as a single JSON line and flush."""
+    buffer = getattr(sys.stdout, "buffer", None)
+    if orjson is not None and buffer is not None:
+        sys.stdout.flush()
+        buffer.write(orjson.dumps(obj) + b"\n")
+        buffer.flush()
+    else:
+        sys.stdout.write(json.dumps(obj) + "\n")
+        sys.stdout.flush()
+
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.S)
+# Braces and whole string literals (escapes included), so the scan below steps over
+# string contents in C instead of visiting every character in Python
+_JSON_SCAN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}]', re.S)
+
+
+def _strip_fences(text: str) -> str:
+    # Models sometimes leave ``` inside string values; drop them once here rather than
+    # from every question and option in normalize_output
+    return text.replace("```", "") if "```" in text else text
+
+
+def _extract_json(text: str) -> Dict[str, Any]:
+    """Return the first JSON object in text, ignoring code fences and surrounding prose.
+
+    Scans from the first "{" to its matching "}" (skipping string literals so braces
+    inside values are ignored). Raises ValueError if no complete object can be parsed.
+    """
+    stripped = text.strip()
+    if stripped.startswith("{") and stripped.endswith("}"):
+        # JSON-mode responses are the bare object; skip the character scan
         try:
-            round_num = int(state.get("round", "1"))
-        except Exception:
-            round_num = 1
-
-        if round_type == "technical_round1":
-            prompt_text = prompt.format(
-                selected_easy_topics=json.dumps(state.get("selected_easy_topics", [])),
-                selected_hard_topics=json.dumps(state.get("selected_hard_topics", [])),
-                resume_text=state.get("resume_text", ""),
-                job_desc=state.get("job_desc", ""),
-            )
-        elif round_type == "technical_round2":
-            prompt_text = prompt.format(
-                remaining_hard_topics=json.dumps(state.get("remaining_hard_topics", state.get("selected_hard_topics", []))),
-                prev_used_hard_topics=json.dumps(state.get("prev_used_hard_topics", [])),
-                resume_text=state.get("resume_text", ""),
-                job_desc=state.get("job_desc", ""),
-            )
+            data = _json_loads(_strip_fences(stripped))
+        except ValueError:
+            pass
         else:
-            prompt_text = prompt.format(
-                resume_text=state.get("resume_text", ""),
-                job_desc=state.get("job_desc", ""),
-                target_role=state.get("target_role", ""),
-                experience=state.get("experience", ""),
-            )
-        result = llm.predict(prompt_text)
-
-        def is_option_like(s: str) -> bool:
-            s = (s or '').strip()
-            return len(s) > 2 and s[1] == '.' and s[0].upper() in ['A', 'B', 'C', 'D']
-
-        def normalize_output(parsed):
-            # Initialize canonical structure
-            out = {"mcq_questions": [], "desc_questions": []}
-
-            # If parsed is dict and appears well-formed
-            if isinstance(parsed, dict):
-                mcqs = parsed.get("mcq_questions")
-                descs = parsed.get("desc_questions")
-                if isinstance(mcqs, list):
-                    for item in mcqs:
-                        if not isinstance(item, dict):
-                            continue
-                        q = str(item.get("question", "")).strip()
-                        # Strip code fence artifacts and numbering like 'Q6.'
-                        q = q.replace("```", "").strip()
-                        if q.lower().startswith("q") and ":" not in q and "." in q[:5]:
-                            # Remove leading 'Qn.' prefix
-                            try:
-                                parts = q.split(".", 1)
-                                if parts[0][1:].isdigit():
-                                    q = parts[1].strip()
-                            except Exception:
-                                pass
-                        # Drop placeholder text entirely
-                        if q.lower().startswith("placeholder mcq"):
-                            q = "Which of the following best aligns with the target role?"
-                        opts_raw = item.get("options", [])
-                        ans = str(item.get("answer", "")).strip().upper()
-                        labeled = []
-                        # Accept either dict {A:...,B:...,C:...,D:...} or list [..]
-                        if isinstance(opts_raw, dict):
-                            a = str(opts_raw.get("A", "Option")).replace("```", "").strip()
-                            b = str(opts_raw.get("B", "Option")).replace("```", "").strip()
-                            c = str(opts_raw.get("C", "Option")).replace("```", "").strip()
-                            d = str(opts_raw.get("D", "Option")).replace("```", "").strip()
-                            labeled = [f"A. {a}", f"B. {b}", f"C. {c}", f"D. {d}"]
-                        else:
-                            opts = item.get("options", [])
-                            if not isinstance(opts, list):
-                                opts = []
-                            # Keep only first 4, enforce labels A-D
-                            opts = [str(o) for o in opts if isinstance(o, str)]
-                            # If options not labeled, label them
-                            for i, o in enumerate(opts[:4]):
-                                label = chr(65 + i)
-                                o = str(o).replace("```", "").strip()
-                                if is_option_like(o):
-                                    labeled.append(o)
-                                else:
-                                    labeled.append(f"{label}. {o}")
-                        # Pad if fewer than 4
-                        while len(labeled) < 4:
-                            label = chr(65 + len(labeled))
-                            labeled.append(f"{label}. " + "Option")
-                        # Validate answer
-                        if ans not in ["A", "B", "C", "D"]:
-                            # try to infer from correct option text if present
-                            ans = "A"
-                        if q:
-                            out["mcq_questions"].append({
-                                "question": q,
-                                "options": labeled[:4],
-                                "answer": ans
-                            })
-                if isinstance(descs, list):
-                    for d in descs:
-                        if not isinstance(d, str):
-                            continue
-                        s = d.replace("```", "").strip()
-                        # Remove leading numbering like 'Q6.'
-                        if s.lower().startswith("q") and "." in s[:5]:
-                            try:
-                                parts = s.split(".", 1)
-                                if parts[0][1:].isdigit():
-                                    s = parts[1].strip()
-                            except Exception:
-                                pass
-                        # Filter out code block markers or empty/very short strings
-                        if not s or len(s) < 8:
-                            continue
-                        if is_option_like(s):
-                            continue
-                        # Prefer questions or instruction-like prompts
-                        if not (s.endswith("?") or s.lower().startswith(("describe", "explain", "how", "what", "why", "design"))):
-                            continue
-                        out["desc_questions"].append(s)
-
-            # If parsed is list or malformed dict, derive heuristically from text
-            if not out["mcq_questions"] and not out["desc_questions"]:
-                lines = []
-                if isinstance(parsed, list):
-                    lines = [str(x) for x in parsed]
-                else:
-                    # fallback: split raw text
-                    raw = str(result).replace("```", "")
-                    lines = [ln.strip("- ") for ln in raw.split("\n") if ln.strip()]
-
-                # Heuristic: collect long sentences as descriptive, group blocks into MCQ when we see a question followed by options
-                temp_mcq = []
-                i = 0
-                while i < len(lines):
-                    line = lines[i]
-                    if not line:
-                        i += 1
-                        continue
-                    # If the line looks like a question (ends with ? or is long) and following lines include options
-                    lookahead = lines[i+1:i+6]
-                    opts = [x for x in lookahead if is_option_like(x)]
-                    # Clean line numbering like 'Q6.'
-                    if line.lower().startswith("q") and "." in line[:5]:
-                        try:
-                            p = line.split(".", 1)
-                            if p[0][1:].isdigit():
-                                line = p[1].strip()
-                        except Exception:
-                            pass
-                    if (line.endswith('?') or len(line) > 40) and len(opts) >= 3:
-                        # take first 4 options
-                        taken = []
-                        for x in lookahead:
-                            if is_option_like(x):
-                                taken.append(x)
-                            if len(taken) == 4:
-                                break
-                        temp_mcq.append({
-                            "question": line if not line.lower().startswith("placeholder mcq") else "Which of the following best aligns with the target role?",
-                            "options": taken if len(taken) == 4 else (taken + [f"{chr(65+len(taken))}. Option"]*(4-len(taken))),
-                            "answer": "A"
-                        })
-                        i += 1 + len(lookahead)
-                        continue
-                    else:
-                        # treat as descriptive candidate if not an option line
-                        if not is_option_like(line):
-                            out["desc_questions"].append(line)
-                    i += 1
-
-                out["mcq_questions"] = temp_mcq
-
-            # Enforce counts exactly: 5 MCQ, 3 desc
-            out["mcq_questions"] = out["mcq_questions"][:5]
-            out["desc_questions"] = [d for d in out["desc_questions"] if not is_option_like(d)][:3]
-
-            # Final safety: ensure each MCQ has exactly 4 options and a valid answer
-            cleaned_mcq = []
-            for m in out["mcq_questions"]:
-                q = str(m.get("question",""))
-                opts = [o for o in (m.get("options") or []) if isinstance(o, str)]
+            if isinstance(data, dict):
+                return data
+    fenced = _FENCE_RE.search(text)
+    if fenced and "{" in fenced.group(1):
+        text = fenced.group(1)
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("no JSON object in model response")
+    depth = 0
+    for m in _JSON_SCAN_RE.finditer(text, start):
+        ch = m.group()
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return _json_loads(_strip_fences(text[start:m.end()]))
+    raise ValueError("unterminated JSON object in model response")
+
+
+def _safe_json(text: str):
+    try:
+        return _extract_json(text)
+    except ValueError:
+        return None
+
+
+# Placeholder names each round template actually references, parsed once at import
+_PROMPT_FIELDS = {
+    k: frozenset(name for _, name, _, _ in string.Formatter().parse(v) if name)
+    for k, v in _ROUND_PROMPTS.items()
+}
+
+
+def _format_batched_prompt(states: Dict[str, InterviewState]) -> str:
+    """Build one prompt asking for every round in states, keyed by round type."""
+    sections = [
+        f"## TASK: {round_type}\n"
+        + _format_round_prompt(round_type, {**state, **_BATCH_CONTEXT_REFS}, _ROUND_TASKS)
+        for round_type, state in states.items()
+    ]
+    any_state = next(iter(states.values()))
+    return (
+        _BATCH_HEADER
+        + "\n\n".join(sections)
+        + f"\n\n# CANDIDATE RESUME:\n{any_state.get('resume_text', '')}"
+        + f"\n\n# JOB DESCRIPTION:\n{any_state.get('job_desc', '')}\n\n"
+        + _BATCH_OUTPUT_FORMAT
+    )
+
+
+# Placeholders whose value is derived from state rather than copied; everything else is
+# a plain string field. Only the ones a template references are ever computed.
+_PROMPT_VALUE_GETTERS: Dict[str, Callable[[InterviewState], str]] = {
+    "selected_easy_topics": lambda state: _json_dumps(state.get("selected_easy_topics", [])),
+    "selected_hard_topics": lambda state: _json_dumps(state.get("selected_hard_topics", [])),
+    "remaining_hard_topics": lambda state: _json_dumps(
+        state.get("remaining_hard_topics", state.get("selected_hard_topics", []))
+    ),
+    "prev_used_hard_topics": lambda state: _json_dumps(state.get("prev_used_hard_topics", [])),
+}
+
+
+def _format_round_prompt(round_type: str, state: InterviewState, templates: Dict[str, str] = _ROUND_PROMPTS) -> str:
+    """Fill the round's template with only the state values it references."""
+    if round_type not in templates:
+        round_type = "technical_round1"
+    return templates[round_type].format_map({
+        name: _PROMPT_VALUE_GETTERS[name](state) if name in _PROMPT_VALUE_GETTERS else state.get(name, "")
+        for name in _PROMPT_FIELDS[round_type]
+    })
+
+
+# Private generator for topic sampling and option shuffling; set INTERVIEW_RANDOM_SEED
+# to make selections reproducible
+_rng = random.Random(os.getenv("INTERVIEW_RANDOM_SEED") or None)
+
+
+def topic_selection(state: InterviewState) -> InterviewState:
+    """Agent 2: Select topics per round:
+    - Round 1: pick 4 random easy topics and 1 random hard topic
+    - Round 2: use all remaining hard topics excluding previously used hard topics
+    """
+    easy = tuple(state.get("easy_topic_skills") or ())
+    hard = tuple(state.get("hard_topic_skills") or ())
+    prev = state.get("prev_used_hard_topics", []) or []
+
+    try:
+        round_num = int(state.get("round", "1"))
+    except Exception:
+        round_num = 1
+
+    if round_num == 1:
+        sel_easy = _rng.sample(easy, k=min(4, len(easy))) if easy else []
+        # A single pick needs one RNG draw, not sample()'s pool bookkeeping
+        sel_hard = [_rng.choice(hard)] if hard else []
+        state["selected_easy_topics"] = sel_easy
+        state["selected_hard_topics"] = sel_hard
+    elif round_num == 2:
+        remaining_hard = [h for h in hard if h not in prev]
+        state["remaining_hard_topics"] = remaining_hard
+        state["selected_easy_topics"] = []
+        state["selected_hard_topics"] = remaining_hard[:]  # for consistency in output
+    else:
+        # Other rounds don't use topic selection
+        state["selected_easy_topics"] = []
+        state["selected_hard_topics"] = []
+    return state
+
+
+_LABELS = ("A", "B", "C", "D")
+_PREFIXES = tuple(f"{label}. " for label in _LABELS)
+_LABEL_SET = frozenset(_LABELS)
+_LABEL_INDEX = {label: i for i, label in enumerate(_LABELS)}
+
+
+_OPTION_LETTERS = "ABCDabcd"
+
+
+def is_option_like(s: str) -> bool:
+    # Callers pass already-stripped strings
+    return len(s) > 2 and s[1] == '.' and s[0] in _OPTION_LETTERS
+
+
+def _already_valid(out) -> bool:
+    """True if out already has 5 MCQs with 4 labeled options and a valid answer, and 3 descs."""
+    return (
+        len(out["mcq_questions"]) == 5
+        and len(out["desc_questions"]) == 3
+        and all(
+            len(m["options"]) == 4 and m["answer"] in _LABEL_SET and all(map(is_option_like, m["options"]))
+            for m in out["mcq_questions"]
+        )
+    )
+
+
+def normalize_output(parsed):
+    """Coerce a parsed LLM response into exactly 5 MCQs and 3 descriptive questions.
+
+    Responses arrive as JSON objects (Groq JSON mode, or extracted from the stream), so
+    entries that cannot be used are dropped and the counts padded with placeholders.
+    """
+    # Initialize canonical structure
+    out = {"mcq_questions": [], "desc_questions": []}
+
+    # If parsed is dict and appears well-formed
+    if isinstance(parsed, dict):
+        mcqs = parsed.get("mcq_questions")
+        descs = parsed.get("desc_questions")
+        if isinstance(mcqs, list):
+            for item in mcqs:
+                if not isinstance(item, dict):
+                    continue
+                # Strip numbering like 'Q6.'
+                q = str(item.get("question", "")).strip()
+                if q.lower().startswith("q") and ":" not in q and "." in q[:5]:
+                    # Remove leading 'Qn.' prefix
+                    try:
+                        parts = q.split(".", 1)
+                        if parts[0][1:].isdigit():
+                            q = parts[1].strip()
+                    except Exception:
+                        pass
+                # Drop placeholder text entirely
+                if q.lower().startswith("placeholder mcq"):
+                    q = "Which of the following best aligns with the target role?"
+                opts_raw = item.get("options", [])
+                ans = str(item.get("answer", "")).strip().upper()
                 labeled = []
-                for i, o in enumerate(opts[:4]):
-                    label = chr(65 + i)
-                    labeled.append(o if is_option_like(o) else f"{label}. {o}")
+                # Accept either dict {A:...,B:...,C:...,D:...} or list [..]
+                if isinstance(opts_raw, dict):
+                    a = str(opts_raw.get("A", "Option")).strip()
+                    b = str(opts_raw.get("B", "Option")).strip()
+                    c = str(opts_raw.get("C", "Option")).strip()
+                    d = str(opts_raw.get("D", "Option")).strip()
+                    labeled = [f"A. {a}", f"B. {b}", f"C. {c}", f"D. {d}"]
+                else:
+                    opts = item.get("options", [])
+                    if not isinstance(opts, list):
+                        opts = []
+                    # Keep only first 4, enforce labels A-D
+                    opts = [str(o) for o in opts if isinstance(o, str)]
+                    # If options not labeled, label them
+                    for i, o in enumerate(opts[:4]):
+                        o = o.strip()
+                        if is_option_like(o):
+                            labeled.append(o)
+                        else:
+                            labeled.append(_PREFIXES[i] + o)
+                # Pad if fewer than 4
                 while len(labeled) < 4:
-                    label = chr(65 + len(labeled))
-                    labeled.append(f"{label}. Option")
-                ans = str(m.get("answer", "A")).strip().upper()
-                if ans not in ["A", "B", "C", "D"]:
+                    labeled.append(_PREFIXES[len(labeled)] + "Option")
+                # Validate answer
+                if ans not in _LABEL_SET:
+                    # try to infer from correct option text if present
                     ans = "A"
                 if q:
-                    cleaned_mcq.append({"question": q, "options": labeled[:4], "answer": ans})
-            out["mcq_questions"] = cleaned_mcq[:5]
-
-            # If still insufficient, trim or pad desc
-            out["desc_questions"] = [d for d in out["desc_questions"] if isinstance(d, str) and d][:3]
-            while len(out["desc_questions"]) < 3:
-                out["desc_questions"].append("Describe a project relevant to the role and your contribution.")
-
-            while len(out["mcq_questions"]) < 5:
-                out["mcq_questions"].append({
-                    "question": "Which of the following best aligns with the target role?",
-                    "options": ["A. Option", "B. Option", "C. Option", "D. Option"],
-                    "answer": "A"
-                })
-
-            # Randomize options for each MCQ and remap the correct answer accordingly
-            def _strip_label(opt: str) -> str:
-                s = (opt or "").strip()
-                if len(s) >= 3 and s[1] == '.' and s[0].upper() in ['A','B','C','D']:
-                    return s[3:].strip()
-                return s
-
-            randomized_mcq = []
-            import random as _rnd
-            for m in out["mcq_questions"]:
-                opts = m.get("options", [])
-                ans_letter = m.get("answer", "A").strip().upper()
-                # Extract plain texts and identify correct text
-                texts = [_strip_label(o) for o in opts[:4]]
-                try:
-                    correct_idx = ["A","B","C","D"].index(ans_letter)
-                except ValueError:
-                    correct_idx = 0
-                correct_text = texts[correct_idx] if texts else ""
-                # Shuffle texts
-                shuffled = texts[:]
-                _rnd.shuffle(shuffled)
-                # Relabel
-                labeled = []
-                new_correct_idx = 0
-                for i, t in enumerate(shuffled[:4]):
-                    label = chr(65 + i)
-                    labeled.append(f"{label}. {t}")
-                    if t == correct_text and new_correct_idx == 0 and correct_text != "":
-                        new_correct_idx = i
-                # If we didn't match above (e.g., duplicates), fallback to position of first occurrence
-                if correct_text != "" and correct_text in shuffled:
-                    new_correct_idx = shuffled.index(correct_text)
-                new_ans = chr(65 + new_correct_idx)
-                randomized_mcq.append({
-                    "question": str(m.get("question","")),
-                    "options": labeled[:4],
-                    "answer": new_ans
-                })
-            out["mcq_questions"] = randomized_mcq[:5]
-
-            return out
-
-        data = _safe_json(result)
-        questions = normalize_output(data)
-        state["questions"] = questions
+                    out["mcq_questions"].append({
+                        "question": q,
+                        "options": labeled[:4],
+                        "answer": ans
+                    })
+        if isinstance(descs, list):
+            for d in descs:
+                if not isinstance(d, str):
+                    continue
+                s = d.strip()
+                # Remove leading numbering like 'Q6.'
+                if s.lower().startswith("q") and "." in s[:5]:
+                    try:
+                        parts = s.split(".", 1)
+                        if parts[0][1:].isdigit():
+                            s = parts[1].strip()
+                    except Exception:
+                        pass
+                # Filter out code block markers or empty/very short strings
+                if not s or len(s) < 8:
+                    continue
+                if is_option_like(s):
+                    continue
+                # Prefer questions or instruction-like prompts
+                if not (s.endswith("?") or s.lower().startswith(("describe", "explain", "how", "what", "why", "design"))):
+                    continue
+                out["desc_questions"].append(s)
+
+    # Enforce counts exactly: 5 MCQ, 3 desc
+    out["mcq_questions"] = out["mcq_questions"][:5]
+    out["desc_questions"] = [d for d in out["desc_questions"] if not is_option_like(d)][:3]
+
+    # A well-formed response (the common case under JSON mode) needs no safety pass
+    if not _already_valid(out):
+        # Final safety: ensure each MCQ has exactly 4 options and a valid answer
+        cleaned_mcq = []
+        for m in out["mcq_questions"]:
+            q = str(m.get("question",""))
+            opts = [o for o in (m.get("options") or []) if isinstance(o, str)]
+            labeled = []
+            for i, o in enumerate(opts[:4]):
+                labeled.append(o if is_option_like(o) else _PREFIXES[i] + o)
+            while len(labeled) < 4:
+                labeled.append(_PREFIXES[len(labeled)] + "Option")
+            ans = str(m.get("answer", "A")).strip().upper()
+            if ans not in _LABEL_SET:
+                ans = "A"
+            if q:
+                cleaned_mcq.append({"question": q, "options": labeled[:4], "answer": ans})
+        out["mcq_questions"] = cleaned_mcq[:5]
+
+        # If still insufficient, trim or pad desc
+        out["desc_questions"] = [d for d in out["desc_questions"] if isinstance(d, str) and d][:3]
+        while len(out["desc_questions"]) < 3:
+            out["desc_questions"].append("Describe a project relevant to the role and your contribution.")
+
+        while len(out["mcq_questions"]) < 5:
+            out["mcq_questions"].append({
+                "question": "Which of the following best aligns with the target role?",
+                "options": ["A. Option", "B. Option", "C. Option", "D. Option"],
+                "answer": "A"
+            })
+
+    # Randomize options for each MCQ and remap the correct answer accordingly
+    def _strip_label(opt: str) -> str:
+        s = (opt or "").strip()
+        if len(s) >= 3 and s[1] == '.' and s[0].upper() in _LABEL_SET:
+            return s[3:].strip()
+        return s
+
+    randomized_mcq = []
+    for m in out["mcq_questions"]:
+        texts = [_strip_label(o) for o in m.get("options", [])[:4]]
+        ans_letter = m.get("answer", "A").strip().upper()
+        correct_idx = _LABEL_INDEX.get(ans_letter, 0)
+        # Shuffle positions rather than texts, so the correct option is tracked by
+        # index instead of searched for by value
+        order = list(range(len(texts)))
+        _rng.shuffle(order)
+        randomized_mcq.append({
+            "question": str(m.get("question","")),
+            "options": [_PREFIXES[i] + texts[k] for i, k in enumerate(order)],
+            "answer": _LABELS[order.index(correct_idx)] if correct_idx < len(order) else "A"
+        })
+    out["mcq_questions"] = randomized_mcq[:5]
+
+    return out
+
+
+def _questions_cache_key(round_type: str, model_name: str, prompt_text: str) -> Optional[str]:
+    """Cache key for a round's questions, or None if they should not be cached.
+
+    Questions are sampled, so they are only reused when LLM_CACHE_SEED is set and
+    repeat sessions keep getting varied questions by default.
+    """
+    seed = os.getenv("LLM_CACHE_SEED", "")
+    if not seed:
+        return None
+    # The formatted prompt embeds resume_text, job_desc and any round-specific topics.
+    return llm_cache.make_key("questions", round_type, model_name, _SAMPLED_TEMPERATURE, seed, prompt_text)
+
+
+def _finalize_questions(result: str, cache_key: Optional[str]) -> Dict[str, Any]:
+    """Normalize a raw LLM response and cache it if it parsed into MCQs.
+
+    Raises ValueError if the response holds no JSON object, rather than guessing
+    questions out of free text.
+    """
+    data = _extract_json(result)
+    questions = normalize_output(data)
+    # Only cache responses that actually parsed; fallback placeholders are not worth keeping
+    if cache_key and data.get("mcq_questions"):
+        llm_cache.cache_put(cache_key, questions)
+    return questions
+
+
+# Resumes longer than this (after whitespace cleanup) are condensed before prompting
+_RESUME_MAX_CHARS = 8000
+
+_RESUME_SUMMARY_PROMPT = """
+Condense the resume below for an interviewer. Extract: (1) roles and durations, (2) tech stack and skills, (3) notable projects and the technologies they used.
+Plain text, max 250 words. Do not invent anything that is not in the resume.
+
+RESUME TEXT:
+{resume_text}
+"""
+
+_PAGE_MARKER_RE = re.compile(r"^\s*(?:page\s+)?\d+\s*(?:of|/)\s*\d+\s*$", re.I | re.M)
+_INLINE_SPACE_RE = re.compile(r"[ \t\r\f\v]+")
+_LINE_BREAK_RE = re.compile(r"\s*\n\s*")
+
+
+async def _compress_resume(text: str) -> str:
+    """Shrink extracted resume text before it is sent to Groq.
+
+    Drops "Page n of m" lines and redundant whitespace; if the result is still over
+    _RESUME_MAX_CHARS it is summarized once with the small model and cached per resume.
+    """
+    text = _PAGE_MARKER_RE.sub("", text or "")
+    text = _INLINE_SPACE_RE.sub(" ", text)
+    text = _LINE_BREAK_RE.sub("\n", text).strip()
+    if len(text) <= _RESUME_MAX_CHARS:
+        return text
+
+    cache_key = llm_cache.make_key("resume_summary", text)
+    cached = llm_cache.cache_get(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        async with groq_limits.groq_slot():
+            summary = (await _ainvoke(
+                _get_llm(_resolve_groq_model()),
+                _RESUME_SUMMARY_PROMPT.format(resume_text=text[:4 * _RESUME_MAX_CHARS]),
+            )).strip()
+    except Exception:
+        summary = ""
+    if not summary:
+        return text[:_RESUME_MAX_CHARS]
+    llm_cache.cache_put(cache_key, summary)
+    return summary
+
+
+def _topics_cache_key(model_name: str, prompt_text: str) -> str:
+    return llm_cache.make_key("topics", model_name, prompt_text)
+
+
+def _parse_topics(result: str, cache_key: str) -> Dict[str, List[str]]:
+    """Trim extracted topics to the prompt's limits and cache them if the response parsed."""
+    data = _safe_json(result) or {}
+    topics = {
+        "easy_topic_skills": (data.get("easy_topic_skills") or [])[:10],
+        "hard_topic_skills": (data.get("hard_topic_skills") or [])[:5],
+    }
+    if topics["easy_topic_skills"] or topics["hard_topic_skills"]:
+        llm_cache.cache_put(cache_key, topics)
+    return topics
+
+
+async def topic_extraction(state: InterviewState, llm: ChatGroq) -> InterviewState:
+    """Agent 1: Extract easy and hard topic skills from the ENTIRE resume (all sections)."""
+    prompt_text = _TOPIC_EXTRACTION_PROMPT.format(resume_text=state.get("resume_text", ""))
+    cache_key = _topics_cache_key(llm.model_name, prompt_text)
+    topics = llm_cache.cache_get(cache_key)
+    if topics is None:
+        async with groq_limits.groq_slot():
+            result = await _ainvoke(llm, prompt_text, max_tokens=_MAX_TOKENS["topic_extraction"], **_JSON_MODE)
+        topics = _parse_topics(result, cache_key)
+    state.update(topics)
+    return state
+
+
+async def generate_questions(
+    state: InterviewState,
+    llm: ChatGroq,
+    model_name: str,
+    round_type: str = "technical_round1",
+    on_mcq: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+) -> InterviewState:
+    """Agent 3: Generate the round's MCQ and descriptive questions from the selected topics."""
+    prompt_text = _format_round_prompt(round_type, state)
+
+    cache_key = _questions_cache_key(round_type, model_name, prompt_text)
+    cached = llm_cache.cache_get(cache_key) if cache_key else None
+    if cached is not None:
+        state["questions"] = cached
         return state
 
-    sg = StateGraph(InterviewState)
-    sg.add_node("topic_extraction", topic_extraction)
-    sg.add_node("topic_selection", topic_selection)
-    sg.add_node("generate", generate_questions)
-    sg.set_entry_point("topic_extraction")
-    sg.add_edge("topic_extraction", "topic_selection")
-    sg.add_edge("topic_selection", "generate")
-    sg.set_finish_point("generate")
-    return sg.compile()
+    max_tokens = _MAX_TOKENS.get(round_type, _DEFAULT_MAX_TOKENS)
+    # The slot is held for the whole stream, so streamed calls count against the limit too
+    async with groq_limits.groq_slot():
+        if on_mcq is None:
+            tier = _service_tier(round_type)
+            result = await _ainvoke(llm, prompt_text, tier, max_tokens=max_tokens, **_JSON_MODE)
+            if not _has_questions(_safe_json(result)):
+                # Most likely truncated at max_tokens
+                result = await _ainvoke(llm, prompt_text, tier, max_tokens=2 * max_tokens, **_JSON_MODE)
+        else:
+            stream_parser = McqStreamParser()
+            chunks = []
+            seen = 0
+            stream = llm.astream(prompt_text, max_tokens=max_tokens)
+            try:
+                async for chunk in stream:
+                    chunks.append(chunk.content)
+                    for mcq in stream_parser.feed(chunk.content):
+                        on_mcq(seen, mcq)
+                        seen += 1
+                    if stream_parser.closed:
+                        # JSON mode is unavailable when streaming, so stop reading (and paying
+                        # for) any trailing prose once the object is complete
+                        break
+            finally:
+                # End the HTTP stream as soon as we stop reading, so the pooled connection
+                # is released instead of idling until the generator is collected
+                await stream.aclose()
+            result = "".join(chunks)
+
+    state["questions"] = _finalize_questions(result, cache_key)
+    return state
+
+
+def _uses_topics(round_type: str) -> bool:
+    """True if the round's prompt is filled from extracted/selected topics."""
+    return not _PROMPT_FIELDS.get(round_type, _PROMPT_FIELDS["technical_round1"]).isdisjoint(_PROMPT_VALUE_GETTERS)
 
-def generate_job_description(target_role: str, experience: str, current_role: str) -> str:
-    """Generate a job description based on target role and experience level."""
-    # Ensure the API key is set
-    if "GROQ_API_KEY" not in os.environ:
-        raise RuntimeError("GROQ_API_KEY environment variable is not set.")
 
-    llm = ChatGroq(temperature=0.7, model_name=_resolve_groq_model(), max_tokens=2048)
-    
-    prompt = ChatPromptTemplate.from_template(
-        """
-        Generate a comprehensive job description for the following role:
-        
-        Target Role: {target_role}
-        Experience Level: {experience} years
-        Current Role: {current_role}
-        
-        Create a realistic and detailed job description that includes:
-        1. Job Title and Company Overview
-        2. Role Summary
-        3. Key Responsibilities (5-7 bullet points)
-        4. Required Skills and Qualifications
-        5. Technical Requirements
-        6. Experience Requirements
-        7. Nice-to-have Skills
-        8. Company Culture and Benefits
-        
-        Make the job description:
-        - Appropriate for the experience level ({experience} years)
-        - Relevant to someone transitioning from {current_role} to {target_role}
-        - Include specific technologies and skills commonly required for {target_role}
-        - Professional and realistic
-        - Comprehensive enough to generate meaningful interview questions
-        
-        Format the output as a well-structured job description that could be posted on a job board.
-        """
+async def arun_round(
+    state: InterviewState,
+    round_type: str = "technical_round1",
+    on_mcq: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    job_desc: Optional[Awaitable[str]] = None,
+) -> InterviewState:
+    """Produce interview questions for one round: topic extraction -> topic selection -> generation.
+
+    Rounds whose prompt references no topics (managerial, HR) skip straight to generation.
+    If on_mcq is given, the question-generation call is streamed and on_mcq(index, mcq)
+    is invoked for every raw MCQ as soon as it has been fully received.
+    If job_desc is given it is awaited only after topic extraction, so a job description
+    still being generated overlaps that call.
+    """
+    model_name = _resolve_groq_model(round_type)
+    state = InterviewState(**state)
+    if _uses_topics(round_type):
+        await topic_extraction(state, _get_llm(_resolve_groq_model()))
+        topic_selection(state)
+    if job_desc is not None:
+        state["job_desc"] = await job_desc
+    return await generate_questions(
+        state, _get_llm(model_name, _SAMPLED_TEMPERATURE), model_name, round_type, on_mcq=on_mcq
     )
-    
+
+
+def run_round(
+    state: InterviewState,
+    round_type: str = "technical_round1",
+    on_mcq: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+) -> InterviewState:
+    """Blocking form of arun_round."""
+    return _run_async(arun_round(state, round_type, on_mcq))
+
+
+_ALL_ROUND_TYPES = ("technical_round1", "technical_round2", "managerial_round", "hr_round")
+
+
+async def generate_all_rounds(
+    resume_text: str,
+    job_desc: Union[str, Awaitable[str]],
+    target_role: str,
+    experience: str,
+    batched: bool = False,
+) -> Dict[str, Any]:
+    """Generate questions for all four rounds concurrently.
+
+    Topics are extracted once and round 2 draws from the hard topics not picked for
+    round 1; the four question prompts are then issued together via asyncio.gather
+    over the shared per-model ChatGroq clients. job_desc may be an awaitable, which
+    is awaited after topic extraction.
+
+    With batched=True the rounds not already cached are requested in a single call
+    (resume and JD sent once) on the technical-round model; any round missing from
+    that response falls back to its own request.
+    """
+    async def _ask(prompt_text: str, model_name: str, max_tokens: int, tier: Optional[str] = None,
+                   temperature: float = _SAMPLED_TEMPERATURE) -> str:
+        llm = _get_llm(model_name, temperature)
+        async with groq_limits.groq_slot():
+            return await _ainvoke(llm, prompt_text, tier, max_tokens=max_tokens, **_JSON_MODE)
+
+    topics_prompt = _TOPIC_EXTRACTION_PROMPT.format(resume_text=resume_text)
+    topics_model = _resolve_groq_model()
+    topics_key = _topics_cache_key(topics_model, topics_prompt)
+    topics = llm_cache.cache_get(topics_key)
+    if topics is None:
+        topics = _parse_topics(
+            await _ask(topics_prompt, topics_model, _MAX_TOKENS["topic_extraction"], temperature=0),
+            topics_key,
+        )
+    if not isinstance(job_desc, str):
+        job_desc = await job_desc
+    base = {
+        "resume_text": resume_text,
+        "job_desc": job_desc,
+        "target_role": target_role,
+        "experience": experience,
+        **topics,
+    }
+    states = {"technical_round1": topic_selection({**base, "round": "1"})}
+    states["technical_round2"] = topic_selection({
+        **base,
+        "round": "2",
+        "prev_used_hard_topics": states["technical_round1"]["selected_hard_topics"],
+    })
+    # Managerial and HR prompts use no topics, so there is nothing to select for them
+    states["managerial_round"] = {**base, "round": "3"}
+    states["hr_round"] = {**base, "round": "4"}
+
+    async def _round(round_type: str) -> Dict[str, Any]:
+        prompt_text = _format_round_prompt(round_type, states[round_type])
+        model_name = _resolve_groq_model(round_type)
+        cache_key = _questions_cache_key(round_type, model_name, prompt_text)
+        cached = llm_cache.cache_get(cache_key) if cache_key else None
+        if cached is not None:
+            return cached
+        max_tokens = _MAX_TOKENS.get(round_type, _DEFAULT_MAX_TOKENS)
+        tier = _service_tier(round_type)
+        result = await _ask(prompt_text, model_name, max_tokens, tier)
+        if not _has_questions(_safe_json(result)):
+            # Most likely truncated at max_tokens
+            result = await _ask(prompt_text, model_name, 2 * max_tokens, tier)
+        return _finalize_questions(result, cache_key)
+
+    async def _batch() -> List[Dict[str, Any]]:
+        done: Dict[str, Dict[str, Any]] = {}
+        # The batched call runs every pending round on one model, so its output is keyed
+        # by that model; a round's own-model entry is still reused when present
+        batch_model = _resolve_groq_model("technical_round1")
+        batch_keys = {}
+        for round_type in _ALL_ROUND_TYPES:
+            prompt_text = _format_round_prompt(round_type, states[round_type])
+            batch_keys[round_type] = _questions_cache_key(round_type, batch_model, prompt_text)
+            for key in dict.fromkeys((
+                _questions_cache_key(round_type, _resolve_groq_model(round_type), prompt_text),
+                batch_keys[round_type],
+            )):
+                cached = llm_cache.cache_get(key) if key else None
+                if cached is not None:
+                    done[round_type] = cached
+                    break
+        pending = [rt for rt in _ALL_ROUND_TYPES if rt not in done]
+        if len(pending) > 1:
+            result = await _ask(
+                _format_batched_prompt({rt: states[rt] for rt in pending}),
+                batch_model,
+                sum(_MAX_TOKENS.get(rt, _DEFAULT_MAX_TOKENS) for rt in pending),
+            )
+            data = _safe_json(result) or {}
+            for round_type in pending:
+                if _has_questions(data.get(round_type)):
+                    # Single-round requests reuse this only when their round runs on batch_model
+                    done[round_type] = normalize_output(data[round_type])
+                    if batch_keys[round_type]:
+                        llm_cache.cache_put(batch_keys[round_type], done[round_type])
+        missing = [rt for rt in _ALL_ROUND_TYPES if rt not in done]
+        for round_type, questions in zip(missing, await asyncio.gather(*(_round(rt) for rt in missing))):
+            done[round_type] = questions
+        return [done[rt] for rt in _ALL_ROUND_TYPES]
+
+    if batched:
+        results = await _batch()
+    else:
+        results = await asyncio.gather(*(_round(rt) for rt in _ALL_ROUND_TYPES))
+    return {
+        "rounds": dict(zip(_ALL_ROUND_TYPES, results)),
+        "easy_topic_skills": base["easy_topic_skills"],
+        "hard_topic_skills": base["hard_topic_skills"],
+        "selections": {
+            rt: {
+                "selected_easy_topics": states[rt].get("selected_easy_topics", []),
+                "selected_hard_topics": states[rt].get("selected_hard_topics", []),
+            }
+            for rt in _ALL_ROUND_TYPES
+        },
+    }
+
+
+_JOB_DESCRIPTION_PROMPT = """
+Generate a comprehensive job description for the role described at the end.
+
+Create a realistic and detailed job description that includes:
+1. Job Title and Company Overview
+2. Role Summary
+3. Key Responsibilities (5-7 bullet points)
+4. Required Skills and Qualifications
+5. Technical Requirements
+6. Experience Requirements
+7. Nice-to-have Skills
+8. Company Culture and Benefits
+
+Make the job description:
+- Appropriate for the stated experience level
+- Relevant to someone transitioning from the current role to the target role
+- Include specific technologies and skills commonly required for the target role
+- Professional and realistic
+- Comprehensive enough to generate meaningful interview questions
+
+Format the output as a well-structured job description that could be posted on a job board.
+
+Target Role: {target_role}
+Experience Level: {experience} years
+Current Role: {current_role}
+"""
+
+
+def _experience_bucket(experience: str) -> str:
+    """Map years of experience to a coarse band so similar profiles share a generated JD."""
     try:
-        result = llm.predict(prompt.format(
+        years = float(str(experience).strip().rstrip("+"))
+    except ValueError:
+        return str(experience).strip()
+    if years <= 2:
+        return "0-2"
+    if years <= 5:
+        return "3-5"
+    if years <= 10:
+        return "6-10"
+    return "10+"
+
+
+# Minimum lengths below which a Groq call cannot produce useful questions
+_MIN_RESUME_CHARS = 50
+_MIN_JOB_DESC_CHARS = 30
+
+# Generated JDs depend only on role and experience band, so one is reused for far longer
+# than a question response and regardless of LLM_CACHE_SEED (it is never shown to the user)
+_JOB_DESCRIPTION_TTL = 30 * 24 * 3600
+
+
+async def _ajob_description(model_name: str, target_role: str, experience_bucket: str, current_role: str) -> str:
+    """Generated JD for one profile, from llm_cache when possible, else from Groq inside groq_slot.
+
+    Raises if the call fails or returns less than _MIN_JOB_DESC_CHARS, so a truncated JD
+    is never stored.
+    """
+    cache_key = _job_description_key(model_name, target_role, experience_bucket, current_role)
+    cached = llm_cache.cache_get(cache_key, max_age=_JOB_DESCRIPTION_TTL)
+    # Entries stored before the length check could be truncated; regenerate those
+    if cached is not None and len(cached) >= _MIN_JOB_DESC_CHARS:
+        return cached
+    async with groq_limits.groq_slot():
+        result = (await _ainvoke(_get_llm(model_name, _SAMPLED_TEMPERATURE), _JOB_DESCRIPTION_PROMPT.format(
             target_role=target_role,
-            experience=experience,
+            experience=experience_bucket,
             current_role=current_role
-        ))
-        return result.strip()
-    except Exception as e:
-        # Fallback job description if generation fails
-        return f"""
+        ), _service_tier("job_description"))).strip()
+    if len(result) < _MIN_JOB_DESC_CHARS:
+        raise ValueError("generated job description is too short")
+    llm_cache.cache_put(cache_key, result)
+    return result
+
+
+def _job_description_key(model_name: str, target_role: str, experience_bucket: str, current_role: str) -> str:
+    return llm_cache.make_key("job_description", model_name, target_role.lower(), experience_bucket, current_role.lower())
+
+
+def _fallback_job_description(target_role: str, experience: str) -> str:
+    """Generic job description used when generation fails."""
+    return f"""
 Job Title: {target_role}
 
 We are seeking a skilled {target_role} with {experience} years of experience to join our dynamic team.
@@ -643,85 +1110,390 @@ Technical Skills:
 • Knowledge of version control systems
 
 We offer competitive compensation, comprehensive benefits, and opportunities for professional growth in a collaborative environment.
-        """.strip()
+    """.strip()
 
-def main():
-    parser = argparse.ArgumentParser(description="Generate interview questions using LangGraph")
-    parser.add_argument("--session_id", required=True)
-    parser.add_argument("--resume_text", required=True)
-    parser.add_argument("--job_desc", default="", help="Job description (empty if generating)")
-    parser.add_argument("--job_desc_option", default="paste", help="Job description option: paste or generate")
-    parser.add_argument("--current_role", required=True)
-    parser.add_argument("--target_role", required=True)
-    parser.add_argument("--experience", required=True)
-    parser.add_argument("--round", default="1", help="Interview round number")
-    parser.add_argument("--prev_used_hard", default="", help="Comma-separated list or JSON array of previously used hard topics (from round 1)")
-    args = parser.parse_args()
 
-    # Determine round type
-    round_num = int(args.round)
-    if round_num == 1:
-        round_type = "technical_round1"
-    elif round_num == 2:
-        round_type = "technical_round2"
-    elif round_num == 3:
-        round_type = "managerial_round"
-    elif round_num == 4:
-        round_type = "hr_round"
-    else:
-        round_type = "technical_round1"  # fallback
-    
-    # Handle job description generation if needed
-    job_desc = args.job_desc
-    if args.job_desc_option == "generate" or not job_desc.strip():
+def generate_job_description(target_role: str, experience: str, current_role: str) -> str:
+    """Generate a job description based on target role and experience level.
+
+    Results are cached per (target role, experience band, current role); a failed
+    generation returns a generic fallback.
+    """
+    return generate_job_descriptions_batch([(target_role, experience, current_role)])[0]
+
+
+async def agenerate_job_descriptions(profiles: List[Tuple[str, str, str]]) -> List[str]:
+    """Job descriptions for many (target_role, experience, current_role) profiles at once.
+
+    Profiles that share a target role, experience band and current role share one
+    generated JD; cache misses are requested concurrently (bounded by groq_limits.groq_slot).
+    """
+    model_name = _resolve_groq_model()
+    # Fails fast (GROQ_API_KEY unset) instead of silently returning fallbacks
+    _get_llm(model_name)
+    keys = [
+        (target_role.strip(), _experience_bucket(experience), current_role.strip())
+        for target_role, experience, current_role in profiles
+    ]
+
+    async def _one(target_role: str, experience_bucket: str, current_role: str) -> Optional[str]:
         try:
-            job_desc = generate_job_description(
-                target_role=args.target_role,
-                experience=args.experience,
-                current_role=args.current_role
-            )
-        except Exception as e:
-            print(json.dumps({"error": f"Failed to generate job description: {str(e)}"}))
-            raise
-    
-    graph = build_graph(round_type)
-    # Parse prev_used_hard topics
-    prev_used_hard_topics: List[str] = []
+            return await _ajob_description(model_name, target_role, experience_bucket, current_role)
+        except Exception:
+            return None
+
+    distinct = list(dict.fromkeys(keys))
+    results = dict(zip(distinct, await asyncio.gather(*(_one(*key) for key in distinct))))
+    return [
+        results[key] if results[key] is not None else _fallback_job_description(target_role, experience)
+        for key, (target_role, experience, _) in zip(keys, profiles)
+    ]
+
+
+def generate_job_descriptions_batch(profiles: List[Tuple[str, str, str]]) -> List[str]:
+    """Blocking form of agenerate_job_descriptions."""
+    return _run_async(agenerate_job_descriptions(profiles))
+
+
+_ROUND_TYPES_BY_NUMBER = {
+    1: "technical_round1",
+    2: "technical_round2",
+    3: "managerial_round",
+    4: "hr_round",
+}
+
+
+def _round_type_for(round_value: Any) -> str:
+    try:
+        return _ROUND_TYPES_BY_NUMBER.get(int(round_value), "technical_round1")
+    except (TypeError, ValueError):
+        return "technical_round1"
+
+
+def _parse_prev_used_hard(value: Any) -> List[str]:
+    """Accept a list, a JSON array string or a comma-separated string of topics."""
+    if isinstance(value, list):
+        return [str(x) for x in value]
     try:
-        if args.prev_used_hard:
-            s = args.prev_used_hard.strip()
-            if s.startswith("["):
-                prev_used_hard_topics = json.loads(s)
-            else:
-                prev_used_hard_topics = [x.strip() for x in s.split(",") if x.strip()]
+        s = (value or "").strip()
+        if s.startswith("["):
+            return _json_loads(s)
+        return [x.strip() for x in s.split(",") if x.strip()]
     except Exception:
-        prev_used_hard_topics = []
+        return []
 
-    state = {
-        "resume_text": args.resume_text,
-        "job_desc": job_desc,
-        "target_role": args.target_role,
-        "experience": args.experience,
-        "round": args.round,
-        "prev_used_hard_topics": prev_used_hard_topics,
-    }
 
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _run_async(coro):
+    """Run coro on one long-lived event loop so async HTTP connections survive between requests."""
+    global _LOOP
+    if _LOOP is None or _LOOP.is_closed():
+        _LOOP = asyncio.new_event_loop()
+    return _LOOP.run_until_complete(coro)
+
+
+@atexit.register
+def _close_http_clients() -> None:
+    _HTTP_CLIENT.close()
+    # The async pool is bound to _LOOP once used, so close it there
+    if _LOOP is not None and not _LOOP.is_closed():
+        _LOOP.run_until_complete(_HTTP_ASYNC_CLIENT.aclose())
+        _LOOP.close()
+
+
+# Years of experience outside this range are treated as input mistakes
+_MAX_EXPERIENCE_YEARS = 60
+# First number in an experience value: "3", "3.5", "10+", "0-1", "<1", "3 years"
+_EXPERIENCE_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+class InvalidInputError(ValueError):
+    """A request field that would make the Groq call fail or return garbage."""
+
+    def __init__(self, field: str, message: str):
+        super().__init__(message)
+        self.field = field
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"error": "invalid_input", "field": self.field, "message": str(self)}
+
+
+def _check_experience(experience: Any) -> None:
+    # The route forwards the form value as-is: ranges use their first number, and
+    # values without one ("Fresher", blank) mean unknown, so only impossible counts fail
+    match = _EXPERIENCE_NUMBER_RE.search(str(experience or ""))
+    if match and not 0 <= float(match.group()) <= _MAX_EXPERIENCE_YEARS:
+        raise InvalidInputError(
+            "experience", f"experience must be between 0 and {_MAX_EXPERIENCE_YEARS} years"
+        )
+
+
+def run_request(req: Dict[str, Any], on_mcq: Optional[Callable[[int, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Handle one generation request and return the output payload.
+
+    req uses the same field names as the CLI flags (session_id, resume_text, job_desc,
+    job_desc_option, current_role, target_role, experience, round, prev_used_hard, all_rounds);
+    round "all" is equivalent to all_rounds.
+    Raises InvalidInputError before any Groq call if the inputs cannot yield questions.
+    """
+    return _run_async(arun_request(req, on_mcq=on_mcq))
+
+
+async def _agenerate_job_description(req: Dict[str, Any]) -> str:
+    # Same slot-admitted async path as batch requests, so this call counts against groq_limits
+    try:
+        job_desc, = await agenerate_job_descriptions([
+            (str(req.get("target_role") or ""), str(req.get("experience") or ""), str(req.get("current_role") or "")),
+        ])
+    except Exception as e:
+        raise RuntimeError(f"Failed to generate job description: {str(e)}") from e
+    _check_job_desc(job_desc)
+    return job_desc
+
+
+def _check_job_desc(job_desc: str) -> None:
+    if len(job_desc.strip()) < _MIN_JOB_DESC_CHARS:
+        raise InvalidInputError("job_desc", f"job_desc must contain at least {_MIN_JOB_DESC_CHARS} characters")
+
+
+async def arun_request(req: Dict[str, Any], on_mcq: Optional[Callable[[int, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Async form of run_request. Blocking steps run in worker threads so several
+    requests can be in flight on one event loop (see serve).
+
+    A generated job description is only needed for question generation, so it is
+    started first and overlaps resume compression and topic extraction.
+    """
+    _check_experience(req.get("experience"))
+    job_desc: Union[str, "asyncio.Task[str]"] = req.get("job_desc") or ""
+    if req.get("job_desc_option", "paste") == "generate" or not job_desc.strip():
+        job_desc = asyncio.create_task(_agenerate_job_description(req))
+    else:
+        _check_job_desc(job_desc)
     try:
-        final = graph.invoke(state)
-        questions = final.get("questions", {})
-        output = {
-            "session_id": args.session_id,
-            "questions": questions,
+        req = {**req, "resume_text": await _compress_resume(req.get("resume_text", ""))}
+        if len(req["resume_text"]) < _MIN_RESUME_CHARS:
+            raise InvalidInputError("resume_text", f"resume_text must contain at least {_MIN_RESUME_CHARS} characters")
+
+        if req.get("all_rounds") or str(req.get("round", "")).strip().lower() == "all":
+            result = await generate_all_rounds(
+                resume_text=req.get("resume_text", ""),
+                job_desc=job_desc,
+                target_role=req.get("target_role", ""),
+                experience=req.get("experience", ""),
+                batched=bool(req.get("batched")),
+            )
+            return {"session_id": req.get("session_id"), **result}
+
+        round_type = _round_type_for(req.get("round", "1"))
+        state = {
+            "resume_text": req.get("resume_text", ""),
+            "target_role": req.get("target_role", ""),
+            "experience": req.get("experience", ""),
+            "round": str(req.get("round", "1")),
+            "prev_used_hard_topics": _parse_prev_used_hard(req.get("prev_used_hard")),
+        }
+        if isinstance(job_desc, str):
+            state["job_desc"] = job_desc
+            final = await arun_round(state, round_type, on_mcq)
+        else:
+            final = await arun_round(state, round_type, on_mcq, job_desc=job_desc)
+        return {
+            "session_id": req.get("session_id"),
+            "questions": final.get("questions", {}),
             # Include selections for backend persistence
             "easy_topic_skills": final.get("easy_topic_skills", []),
             "hard_topic_skills": final.get("hard_topic_skills", []),
             "selected_easy_topics": final.get("selected_easy_topics", []),
             "selected_hard_topics": final.get("selected_hard_topics", []),
         }
-        print(json.dumps(output))
+    finally:
+        # An early failure must not leave the job description call running unobserved
+        if isinstance(job_desc, asyncio.Task):
+            if not job_desc.done():
+                job_desc.cancel()
+            elif not job_desc.cancelled():
+                job_desc.exception()
+
+
+def _server_concurrency() -> int:
+    try:
+        return max(1, int(os.getenv("AI_INTERVIEW_CONCURRENCY", "4")))
+    except ValueError:
+        return 4
+
+
+async def _handle_line(line: str) -> Dict[str, Any]:
+    try:
+        req = _json_loads(line)
+    except Exception as e:
+        return {"error": str(e), "session_id": None}
+    return await _handle_request(req)
+
+
+async def _handle_request(req: Any) -> Dict[str, Any]:
+    try:
+        resp = await arun_request(req)
+    except InvalidInputError as e:
+        resp = {**e.to_dict(), "session_id": req.get("session_id")}
+    except Exception as e:
+        resp = {"error": str(e), "session_id": req.get("session_id") if isinstance(req, dict) else None}
+    if isinstance(req, dict) and "id" in req:
+        resp["id"] = req["id"]
+    return resp
+
+
+async def _arun_batch(reqs: List[Any]) -> List[Dict[str, Any]]:
+    """Responses for several requests, in order. Job descriptions they need generated
+    are produced up front in one agenerate_job_descriptions call."""
+    needs_jd = [
+        req for req in reqs
+        if isinstance(req, dict)
+        and (req.get("job_desc_option", "paste") == "generate" or not str(req.get("job_desc") or "").strip())
+    ]
+    if needs_jd:
+        job_descs = await agenerate_job_descriptions([
+            (req.get("target_role", ""), req.get("experience", ""), req.get("current_role", ""))
+            for req in needs_jd
+        ])
+        filled = {id(req): {**req, "job_desc": jd, "job_desc_option": "paste"} for req, jd in zip(needs_jd, job_descs)}
+        reqs = [filled.get(id(req), req) for req in reqs]
+    return list(await asyncio.gather(*(_handle_request(req) for req in reqs)))
+
+
+async def _serve() -> None:
+    loop = asyncio.get_running_loop()
+    lines: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+
+    def _read_stdin() -> None:
+        for line in sys.stdin:
+            loop.call_soon_threadsafe(lines.put_nowait, line)
+        loop.call_soon_threadsafe(lines.put_nowait, None)
+
+    # Daemon thread so a blocked readline never holds up shutdown
+    threading.Thread(target=_read_stdin, name="stdin-reader", daemon=True).start()
+    # SIGTERM stops intake; requests already in flight still get their response
+    signal.signal(signal.SIGTERM, lambda signum, frame: loop.call_soon_threadsafe(lines.put_nowait, None))
+
+    sem = asyncio.Semaphore(_server_concurrency())
+    in_flight = set()
+
+    async def _run(line: str) -> None:
+        async with sem:
+            resp = await _handle_line(line)
+        # Responses are written from the loop thread only, so lines never interleave
+        _write_json(resp)
+
+    while True:
+        line = await lines.get()
+        if line is None:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        task = asyncio.create_task(_run(line))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+
+def serve() -> None:
+    """Worker mode: read one JSON request per line on stdin, write one JSON response per line.
+
+    Imports and the ChatGroq clients stay warm across requests, and up to
+    AI_INTERVIEW_CONCURRENCY (default 4) requests are processed at once, so responses
+    may arrive out of order; an "id" field on the request is echoed back so the caller
+    can match them.
+    """
+    # Build every client up front so the first request does not pay for it;
+    # a missing GROQ_API_KEY is reported per request instead.
+    if "GROQ_API_KEY" in os.environ:
+        for model_name in {_resolve_groq_model(), *map(_resolve_groq_model, _ALL_ROUND_TYPES)}:
+            _get_llm(model_name)
+    _run_async(_serve())
+
+
+_STDIN_REQUIRED_FIELDS = ("session_id", "resume_text", "current_role", "target_role", "experience")
+
+
+def _apply_stdin_fields(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Merge the JSON object on stdin into args (for resume/JD text too large for argv)."""
+    try:
+        fields = _json_loads(sys.stdin.buffer.read())
+    except ValueError as e:
+        parser.error(f"--stdin: invalid JSON ({e})")
+    if not isinstance(fields, dict):
+        parser.error("--stdin: expected a JSON object")
+    for name, value in fields.items():
+        if hasattr(args, name) and name not in ("stdin", "server"):
+            setattr(args, name, value)
+    missing = [name for name in _STDIN_REQUIRED_FIELDS if getattr(args, name) is None]
+    if missing:
+        parser.error("the following arguments are required: " + ", ".join("--" + name for name in missing))
+
+
+def main():
+    if "--server" in sys.argv[1:]:
+        serve()
+        return
+
+    batch_parser = argparse.ArgumentParser(add_help=False)
+    batch_parser.add_argument("--batch_json")
+    batch_args, _ = batch_parser.parse_known_args()
+    if batch_args.batch_json is not None:
+        try:
+            reqs = _json_loads(batch_args.batch_json)
+            if not isinstance(reqs, list):
+                raise ValueError("--batch_json must be a JSON array of request objects")
+        except Exception as e:
+            _write_json({"error": str(e)})
+            sys.exit(2)
+        _write_json(_run_async(_arun_batch(reqs)))
+        return
+
+    # With --stdin the required fields may arrive in the JSON object instead of argv
+    from_stdin = "--stdin" in sys.argv[1:]
+    parser = argparse.ArgumentParser(description="Generate interview questions with Groq")
+    parser.add_argument("--session_id", required=not from_stdin)
+    parser.add_argument("--resume_text", required=not from_stdin)
+    parser.add_argument("--job_desc", default="", help="Job description (empty if generating)")
+    parser.add_argument("--job_desc_option", default="paste", help="Job description option: paste or generate")
+    parser.add_argument("--current_role", required=not from_stdin)
+    parser.add_argument("--target_role", required=not from_stdin)
+    parser.add_argument("--experience", required=not from_stdin)
+    parser.add_argument("--round", default="1", help="Interview round number (1-4), or 'all' for the same as --all_rounds")
+    parser.add_argument("--prev_used_hard", default="", help="Comma-separated list or JSON array of previously used hard topics (from round 1)")
+    parser.add_argument("--all_rounds", action="store_true", help="Generate all four rounds concurrently in one run")
+    parser.add_argument("--batched", action="store_true", help="With all rounds, request the rounds in a single LLM call")
+    parser.add_argument("--stream", action="store_true", help="Emit a JSON line per MCQ as it is generated, before the final payload")
+    parser.add_argument("--server", action="store_true", help="Run as a long-lived worker reading JSON requests from stdin")
+    parser.add_argument("--stdin", action="store_true", help="Read a JSON object of request fields from stdin; its values override argv")
+    parser.add_argument("--batch_json", help="JSON array of request objects; prints a JSON array of responses in the same order")
+    args = parser.parse_args()
+    if args.stdin:
+        _apply_stdin_fields(parser, args)
+
+    on_mcq = None
+    if args.stream:
+        # Partial lines carry only the question text; shuffled options and answers
+        # are only part of the final payload so the two can never disagree.
+        def on_mcq(index: int, mcq: Dict[str, Any]) -> None:
+            question = str(mcq.get("question", "")).strip() if isinstance(mcq, dict) else ""
+            if question:
+                _write_json({"session_id": args.session_id, "partial": {"index": index, "question": question}})
+
+    try:
+        output = run_request(vars(args), on_mcq=on_mcq)
+        _write_json(output)
+    except InvalidInputError as e:
+        _write_json(e.to_dict())
+        sys.exit(2)
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        _write_json({"error": str(e)})
         raise
 
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
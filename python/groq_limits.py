@@ -0,0 +1,75 @@
+import asyncio
+import contextlib
+import os
+import time
+from typing import Optional
+
+# Process-wide admission control for async Groq calls, shared by the scripts.
+# Every call takes a token from a requests-per-minute bucket (GROQ_RPM, default
+# 30 = free tier) and then holds one of GROQ_MAX_CONCURRENCY (default 8)
+# in-flight slots, so concurrent fan-outs are spread out instead of tripping
+# 429s and SDK backoff. In long-lived worker modes the limits span requests.
+
+
+class AsyncTokenBucket:
+    """Token bucket for async callers: refills `rate` tokens per second up to `capacity`.
+
+    acquire() waits until enough tokens are available, so bursts of concurrent
+    Groq calls are spread out instead of tripping 429s and SDK backoff.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        # asyncio.Lock is tied to one event loop; rebuild it if called from another
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+def _groq_rpm() -> int:
+    try:
+        return max(1, int(os.getenv("GROQ_RPM", "30")))
+    except ValueError:
+        return 30
+
+
+def _groq_max_concurrency() -> int:
+    try:
+        return max(1, int(os.getenv("GROQ_MAX_CONCURRENCY", "8")))
+    except ValueError:
+        return 8
+
+
+_bucket = AsyncTokenBucket(rate=_groq_rpm() / 60, capacity=_groq_rpm())
+_sem: Optional[asyncio.Semaphore] = None
+_sem_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+@contextlib.asynccontextmanager
+async def groq_slot():
+    """Admit one Groq call: take a token from the RPM bucket, then hold one of the
+    GROQ_MAX_CONCURRENCY process-wide in-flight slots until the block exits."""
+    global _sem, _sem_loop
+    await _bucket.acquire()
+    # Like the bucket's lock, the semaphore is tied to one event loop
+    loop = asyncio.get_running_loop()
+    if _sem_loop is not loop:
+        _sem, _sem_loop = asyncio.Semaphore(_groq_max_concurrency()), loop
+    async with _sem:
+        yield
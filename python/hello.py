@@ -1,65 +1,339 @@
+import asyncio
+import functools
+import importlib.util
+import logging
 import sys
 import os
 import json
 import re
-from typing import TypedDict, List, Optional
+import signal
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, TypedDict, List, Optional
+
+import groq_limits
+import llm_cache
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encode/decode
+    orjson = None
+
+# Progress and error diagnostics go to stderr via logging; stdout carries only the report
+log = logging.getLogger(__name__)
 
 # Ensure UTF-8 encoding for stdout to avoid UnicodeEncodeError on Windows
 if sys.version_info >= (3, 7) and hasattr(sys.stdout, "reconfigure"):
     sys.stdout.reconfigure(encoding="utf-8")
 
-# Update imports to prefer the recommended packages and avoid deprecation warnings
-try:
+# Update imports to prefer the recommended packages and avoid deprecation warnings.
+# find_spec only probes for the package, so the choice costs no failed imports.
+if importlib.util.find_spec("langchain_community") is not None:
     # Preferred location as of LangChain 0.2+
     from langchain_community.chat_models import ChatOpenAI
-except ImportError:
-    try:
-        # New dedicated package (LangChain > 1.0)
-        from langchain_openai import ChatOpenAI  # type: ignore
-    except ImportError:
-        # Fallback for older installs – may raise a deprecation warning
-        from langchain.chat_models import ChatOpenAI
+elif importlib.util.find_spec("langchain_openai") is not None:
+    # New dedicated package (LangChain > 1.0)
+    from langchain_openai import ChatOpenAI  # type: ignore
+else:
+    # Fallback for older installs – may raise a deprecation warning
+    from langchain.chat_models import ChatOpenAI
 
 # The remaining LangChain / LangGraph imports
 try:
     from langchain_core.prompts import ChatPromptTemplate
-    from langchain_core.output_parsers import StrOutputParser
-    from langgraph.graph import StateGraph, END
+    from langchain_core.exceptions import OutputParserException
+    from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
+    from langgraph.graph import StateGraph, START, END
 except ImportError as e:
     print(f"Required package not found: {e}")
     print("Please install the required packages using: pip install -U langchain langchain-core langchain-community langgraph")
     sys.exit(1)
 
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+
+
+def _json_loads(text: str) -> Any:
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def _json_dumps(obj: Any) -> str:
+    # Compact UTF-8 either way, so prompts (and their cache keys) match with or without orjson
+    return orjson.dumps(obj).decode() if orjson is not None else json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+# Collapses whitespace runs when comparing work experience descriptions
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_MODEL_ALIASES = {
+    "llama3-70b-8192": "llama-3.3-70b-versatile",
+    "llama3-8b-8192": "llama-3.1-8b-instant",
+    "llama3-70b": "llama-3.3-70b-versatile",
+    "llama3-8b": "llama-3.1-8b-instant",
+}
+
+
+def _resolve_groq_model() -> str:
+    """Resolve a supported Groq model, remapping deprecated names and honoring env var GROQ_MODEL."""
+    env_model = os.getenv("GROQ_MODEL")
+    if env_model:
+        return _MODEL_ALIASES.get(env_model, env_model)
+    return "llama-3.1-8b-instant"
+
+
+# Resume extraction is mechanical JSON restructuring, so it stays on the fast 8B model
+# even when GROQ_MODEL points the report chains at a larger one.
+_EXTRACTION_MODEL = "llama-3.1-8b-instant"
+
+
+def _resolve_extraction_model() -> str:
+    """Model for the resume extraction call; GROQ_MODEL_EXTRACTION overrides the default."""
+    env_model = os.getenv("GROQ_MODEL_EXTRACTION")
+    if env_model:
+        return _MODEL_ALIASES.get(env_model, env_model)
+    return _EXTRACTION_MODEL
+
+
+@functools.lru_cache(maxsize=4)
+def _get_llm(groq_api_key: str, model_name: str):
+    """Shared client per (API key, model) so its HTTP connection pool stays warm across analyses"""
+    return ChatOpenAI(
+        openai_api_base=GROQ_BASE_URL,
+        openai_api_key=groq_api_key,
+        model=model_name
+    )
+
+
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _run_async(coro):
+    """Run coro on one long-lived event loop; the shared clients' async connections are bound to it."""
+    global _LOOP
+    if _LOOP is None or _LOOP.is_closed():
+        _LOOP = asyncio.new_event_loop()
+    return _LOOP.run_until_complete(coro)
+
+
+# Final report layout; each section is filled from the state field of the node that writes it
+_REPORT_HEADER = "\n# 🧾 Final Career Analysis Report\n\n---\n\n"
+_REPORT_SECTIONS = (
+    ("skills_match_report", "## ✅ Skills Match Report"),
+    ("role_relevance_report", "## 🎯 Role Relevance Report"),
+    ("projects_report", "## 💻 Enhancements to Projects (Aligned to JD & Target Role)"),
+    ("work_experience_report", "## 💼 Enhancements to Work Experience (Aligned to JD & Target Role)"),
+)
+_REPORT_FOOTER = """### 📝 Summary
+- This report evaluates your readiness for the target role.
+- Use the suggestions to improve your fit and bridge any gaps.
+"""
+
+
+_MISSING_INPUTS_MESSAGE = "❌ Please provide both resume text and job description."
+
+
+def _missing_inputs(resume_text: Optional[str], job_description: Optional[str]) -> bool:
+    """True if there is nothing to analyze; whitespace-only text counts as missing"""
+    return not (resume_text or "").strip() or not (job_description or "").strip()
+
+
+def _report_section(title: str, body: str) -> str:
+    return f"{title}\n{body}\n\n---\n\n"
+
+
+def _one_pass_enabled() -> bool:
+    """RESUME_ANALYZER_ONE_PASS=1 writes every report section from a single Groq call"""
+    return os.getenv("RESUME_ANALYZER_ONE_PASS", "").strip().lower() in ("1", "true", "yes")
+
+
+# Prompt templates are immutable, so they are built once at import and shared by every graph
+# One extraction call returns projects, skills and work experience together,
+# so the resume is only sent (and paid for) once
+_RESUME_EXTRACTION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert resume parser.\n\n<RESUME>\n{resume_text}\n</RESUME>"),
+    ("user", """
+    From the resume above, extract the projects, skills and work experience.
+
+    Rules:
+    - "projects": every project listed in the resume.
+    - "skills": only clearly mentioned tools, technologies, and proficiencies in the **Skills** section of the resume; do not extract skills mentioned only in the work experience or projects.
+    - "work_experience": every work experience entry.
+
+    Return the result as a single JSON object in this exact format:
+    {{
+        "projects": [
+            {{
+                "name": "Project Name",
+                "technologies": "Tech1, Tech2",
+                "description": "Description in bullet points",
+                "github_link": "https://github.com/user/repo"
+            }}
+        ],
+        "skills": ["skill1", "skill2", "skill3"],
+        "work_experience": [
+            {{
+                "company": "Company Name",
+                "role": "Job Title",
+                "tenure": "Duration/Dates",
+                "description": "Description of the work experience"
+            }}
+        ]
+    }}
+    """)
+])
+
+_SKILLS_MATCH_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert career analyst."),
+    ("user", """
+    Given the extracted skills, job description, and target role, generate a **Skills Match Report**.
+
+    ## Report Format (Markdown):
+    - **Skill Match Score**: (score out of 100)
+    - **Strengths**: (skills user already has that match the JD and role)
+    - **Suggestions**: (skills user should acquire or improve to meet the JD)
+
+    ### Data:
+    **Extracted Skills**: {skills}  
+    **Job Description**: {jd}  
+    **Target Role**: {target_role}
+    """)
+])
+
+_ROLE_RELEVANCE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a career path advisor."),
+    ("user", """
+    Compare the user's **current role** and **target role**, and generate a **Role Relevance Report**.
+
+    Use BOTH the full resume text and job description to ground your analysis.
+
+    ## Report Format (Markdown):
+    - **Role Relevance Score**: (score out of 100)
+    - **Strengths**: (how roles align, cite evidence from resume/JD)
+    - **Suggestions**: (gaps and recommendations to bridge the roles, cite evidence)
+
+    ### Data:
+    **Current Role**: {current_role}  
+    **Target Role**: {target_role}  
+    **Resume Text**: {resume_text}  
+    **Job Description**: {jd}
+    """)
+])
+
+_WORK_EXPERIENCE_REWRITE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a resume optimization expert."),
+    ("user", """
+    Given the following work experiences (JSON), job description, and target role, rewrite each experience in this exact markdown format:
+
+    ### Experience i: ROLE at COMPANY
+    **Original**
+    <original description>
+
+    **Enhancements**
+    <improved version aligned with the JD and target role>
+
+    **Reason**
+    <brief explanation why the changes improve alignment and impact>
+
+    Rules:
+    - Replace i with a sequential number starting from 1.
+    - Replace ROLE and COMPANY using the parsed fields from each experience.
+    - Keep headings and bold labels exactly as shown (case-sensitive).
+    - Separate each experience block with one blank line.
+
+    Data:
+    Job Description: {jd}
+    Target Role: {target_role}
+    Work Experiences (JSON array):
+    {work_experience}
+    """)
+])
+
+_PROJECTS_REWRITE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a resume optimization expert."),
+    ("user", """
+    Given the following projects (JSON), job description, and target role, rewrite each project to match the SAME structure as work experience. Use this exact markdown format:
+
+    ### Project i - PROJECT_NAME
+    **Original**
+    <original project description>
+
+    **Enhancements**
+    <rewritten version aligned with the JD and target role>
+
+    **Reason**
+    <brief explanation why these changes improve alignment and impact>
+
+    Rules:
+    - Replace i with a sequential number starting from 1.
+    - Replace PROJECT_NAME using the "name" field from each project JSON object.
+    - Keep headings and bold labels exactly as shown (case-sensitive).
+    - Separate each project block with one blank line.
+
+    ### Data:
+    **Job Description**: {jd}  
+    **Target Role**: {target_role}  
+    **Projects**:  
+    {projects}
+    """)
+])
+
+# Fused alternative to the five calls above: the resume and JD are sent once and
+# every report section comes back in one JSON object
+_ONE_PASS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are an expert career analyst and resume optimization expert.\n\n<RESUME>\n{resume_text}\n</RESUME>"),
+    ("user", """
+    Analyze the resume above against the job description and roles below, and return a single JSON object with exactly these string fields, each holding Markdown:
+
+    - "skills_match_report": a **Skills Match Report** based only on the resume's **Skills** section, with
+      - **Skill Match Score**: (score out of 100)
+      - **Strengths**: (skills user already has that match the JD and role)
+      - **Suggestions**: (skills user should acquire or improve to meet the JD)
+    - "role_relevance_report": a **Role Relevance Report** comparing the current and target role, with
+      - **Role Relevance Score**: (score out of 100)
+      - **Strengths**: (how roles align, cite evidence from resume/JD)
+      - **Suggestions**: (gaps and recommendations to bridge the roles, cite evidence)
+    - "projects_report": every project in the resume, each as
+      ### Project i - PROJECT_NAME
+      **Original**, **Enhancements** (rewritten to align with the JD and target role) and **Reason** blocks
+    - "work_experience_report": every work experience entry in the resume, each as
+      ### Experience i: ROLE at COMPANY
+      **Original**, **Enhancements** (improved to align with the JD and target role) and **Reason** blocks
+
+    Rules:
+    - Replace i with a sequential number starting from 1.
+    - Keep headings and bold labels exactly as shown (case-sensitive).
+    - Separate each project or experience block with one blank line.
+
+    ### Data:
+    **Current Role**: {current_role}  
+    **Target Role**: {target_role}  
+    **Job Description**: {jd}
+    """)
+])
+
+
+_EXTRACTION_PARSER = JsonOutputParser()
+
+
 class ResumeAnalyzer:
     def __init__(self, groq_api_key: str):
         """Initialize the Resume Analyzer with Groq API key"""
         # Directly use the API key passed from JavaScript
-        GROQ_BASE_URL = "https://api.groq.com/openai/v1"
-        
-        def _resolve_groq_model() -> str:
-            """Resolve a supported Groq model, remapping deprecated names and honoring env var GROQ_MODEL."""
-            alias_map = {
-                "llama3-70b-8192": "llama-3.1-70b-versatile",
-                "llama3-8b-8192": "llama-3.1-8b-instant",
-                "llama3-70b": "llama-3.1-70b-versatile",
-                "llama3-8b": "llama-3.1-8b-instant",
-            }
-            env_model = os.getenv("GROQ_MODEL")
-            if env_model:
-                return alias_map.get(env_model, env_model)
-            return "llama-3.1-8b-instant"
-        
-        self.llm = ChatOpenAI(
-            openai_api_base=GROQ_BASE_URL,
-            openai_api_key=groq_api_key,
-            model=_resolve_groq_model()
-        )
-        
-        # Build the LangGraph workflow
-        self.graph = self._build_graph()
+        self._groq_api_key = groq_api_key
+        self._model_name = _resolve_groq_model()
+        self._extraction_model = _resolve_extraction_model()
+        self.llm = _get_llm(groq_api_key, self._model_name)
+        self.extraction_llm = _get_llm(groq_api_key, self._extraction_model)
+        self._one_pass = _one_pass_enabled()
+
+    @property
+    def graph(self):
+        """The compiled LangGraph workflow, built on first use and shared per (API key, models, mode)"""
+        return _get_graph(self._groq_api_key, self._model_name, self._extraction_model, self._one_pass)
     
-    def _build_graph(self):
-        """Build the LangGraph workflow"""
+    @staticmethod
+    def _build_graph(llm, extraction_llm, one_pass: bool = False):
+        """Build the LangGraph workflow: resume extraction on extraction_llm, reports on llm.
+        With one_pass, a single call on llm writes all report sections instead.
+        The result holds no per-request state."""
         
         # Define state schema
         class AgentState(TypedDict):
@@ -77,209 +351,114 @@ class ResumeAnalyzer:
             work_experience_report: Optional[str]
             projects_report: Optional[str]
         
-        # Create prompt templates
-        project_extraction_prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert resume parser."),
-            ("user", """
-            Given the following resume text, extract all the projects in this JSON format:
-
-            Return the result as a JSON array where each object represents one project:
-            [
-                {{
-                    "name": "Project Name",
-                    "technologies": "Tech1, Tech2",
-                    "description": "Description in bullet points",
-                    "github_link": "https://github.com/user/repo"
-                }}
-            ]
-
-            Resume text:
-            {resume_text}
-            """)
-        ])
-
-        skills_extraction_prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert at analyzing resumes and extracting core technical skills."),
-            ("user", """
-            Extract a list of **technical and professional skills** from the given resume text. 
-            Only include clearly mentioned tools, technologies, and proficiencies in only **skills** section in the resume, donot extract the skills mentioned in the work experience or projects, only and only consider the skills which are mentioned in the Skills section.
-            Return the result in this exact JSON format:
-
-            {{
-                "skills": ["skill1", "skill2", "skill3"]
-            }}
-
-            Resume Text:
-            {resume_text}
-            """)
-        ])
-
-        work_experience_prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert resume parser specialized in extracting structured professional experiences."),
-            ("user", """
-            Given the following resume text, extract all the **work experience** details in this JSON format:
-
-            Return the result as a JSON array where each object represents one work experience:
-            [
-                {{
-                    "company": "Company Name",
-                    "role": "Job Title",
-                    "tenure": "Duration/Dates",
-                    "description": "Description of the work experience"
-                }}
-            ]
-
-            Resume Text:
-            {resume_text}
-            """)
-        ])
-
-        skills_match_prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert career analyst."),
-            ("user", """
-            Given the extracted skills, job description, and target role, generate a **Skills Match Report**.
-
-            ## Report Format (Markdown):
-            - **Skill Match Score**: (score out of 100)
-            - **Strengths**: (skills user already has that match the JD and role)
-            - **Suggestions**: (skills user should acquire or improve to meet the JD)
-
-            ### Data:
-            **Extracted Skills**: {skills}  
-            **Job Description**: {jd}  
-            **Target Role**: {target_role}
-            """)
-        ])
-
-        role_relevance_prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a career path advisor."),
-            ("user", """
-            Compare the user's **current role** and **target role**, and generate a **Role Relevance Report**.
-
-            Use BOTH the full resume text and job description to ground your analysis.
-
-            ## Report Format (Markdown):
-            - **Role Relevance Score**: (score out of 100)
-            - **Strengths**: (how roles align, cite evidence from resume/JD)
-            - **Suggestions**: (gaps and recommendations to bridge the roles, cite evidence)
-
-            ### Data:
-            **Current Role**: {current_role}  
-            **Target Role**: {target_role}  
-            **Resume Text**: {resume_text}  
-            **Job Description**: {jd}
-            """)
-        ])
-
-        work_experience_rewrite_prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a resume optimization expert."),
-            ("user", """
-            Given the following work experiences (JSON), job description, and target role, rewrite each experience in this exact markdown format:
-
-            ### Experience i: ROLE at COMPANY
-            **Original**
-            <original description>
-
-            **Enhancements**
-            <improved version aligned with the JD and target role>
-
-            **Reason**
-            <brief explanation why the changes improve alignment and impact>
-
-            Rules:
-            - Replace i with a sequential number starting from 1.
-            - Replace ROLE and COMPANY using the parsed fields from each experience.
-            - Keep headings and bold labels exactly as shown (case-sensitive).
-            - Separate each experience block with one blank line.
-
-            Data:
-            Job Description: {jd}
-            Target Role: {target_role}
-            Work Experiences (JSON array):
-            {work_experience}
-            """)
-        ])
-
-        projects_rewrite_prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a resume optimization expert."),
-            ("user", """
-            Given the following projects (JSON), job description, and target role, rewrite each project to match the SAME structure as work experience. Use this exact markdown format:
-
-            ### Project i - PROJECT_NAME
-            **Original**
-            <original project description>
-
-            **Enhancements**
-            <rewritten version aligned with the JD and target role>
-
-            **Reason**
-            <brief explanation why these changes improve alignment and impact>
-
-            Rules:
-            - Replace i with a sequential number starting from 1.
-            - Replace PROJECT_NAME using the "name" field from each project JSON object.
-            - Keep headings and bold labels exactly as shown (case-sensitive).
-            - Separate each project block with one blank line.
-
-            ### Data:
-            **Job Description**: {jd}  
-            **Target Role**: {target_role}  
-            **Projects**:  
-            {projects}
-            """)
-        ])
-
         # Create chains
-        project_extraction_chain = project_extraction_prompt | self.llm | StrOutputParser()
-        skill_extraction_chain = skills_extraction_prompt | self.llm | StrOutputParser()
-        work_experience_chain = work_experience_prompt | self.llm | StrOutputParser()
-        skills_match_chain = skills_match_prompt | self.llm | StrOutputParser()
-        role_relevance_chain = role_relevance_prompt | self.llm | StrOutputParser()
-        work_experience_rewrite_chain = work_experience_rewrite_prompt | self.llm | StrOutputParser()
-        project_rewrite_chain = projects_rewrite_prompt | self.llm | StrOutputParser()
-
-        # Define node functions
-        def extract_projects_node(state):
-            response = project_extraction_chain.invoke({"resume_text": state["resume_text"]})
-            json_match = re.search(r"\[\s*{.*?}\s*\]", response, re.DOTALL)
-            projects = json.loads(json_match.group(0)) if json_match else []
-            return {"projects_json": projects}
-
-        def extract_skills_node(state):
-            response = skill_extraction_chain.invoke({"resume_text": state["resume_text"]})
-            match = re.search(r"{.*}", response, re.DOTALL)
-            skills_json = json.loads(match.group(0)) if match else {"skills": []}
-            return {"skills_list": skills_json["skills"]}
-
-        def extract_work_experience_node(state):
-            response = work_experience_chain.invoke({"resume_text": state["resume_text"]})
-            match = re.search(r"\[\s*{.*?}\s*\]", response, re.DOTALL)
-            work_exps = json.loads(match.group(0)) if match else []
+        # JSON mode guarantees the extraction response is one parseable object
+        resume_extraction_chain = (
+            _RESUME_EXTRACTION_PROMPT
+            | extraction_llm.bind(response_format={"type": "json_object"})
+            | StrOutputParser()
+        )
+        skills_match_chain = _SKILLS_MATCH_PROMPT | llm | StrOutputParser()
+        role_relevance_chain = _ROLE_RELEVANCE_PROMPT | llm | StrOutputParser()
+        work_experience_rewrite_chain = _WORK_EXPERIENCE_REWRITE_PROMPT | llm | StrOutputParser()
+        project_rewrite_chain = _PROJECTS_REWRITE_PROMPT | llm | StrOutputParser()
+        one_pass_chain = (
+            _ONE_PASS_PROMPT
+            | llm.bind(response_format={"type": "json_object"})
+            | StrOutputParser()
+        )
+
+        async def guarded_ainvoke(chain, inputs: Dict[str, Any]) -> str:
+            # Admission through the process-wide RPM bucket and in-flight cap
+            async with groq_limits.groq_slot():
+                return await chain.ainvoke(inputs)
+
+        async def cached_ainvoke(name: str, chain, inputs: Dict[str, Any],
+                                 parse: Optional[Callable[[str], Any]] = None, model=llm,
+                                 sampled: Optional[bool] = None, refresh: bool = False) -> str:
+            """Run chain on inputs, reusing a stored response from llm_cache when possible.
+
+            A response is only stored once parse (if given) accepts it (returns non-None).
+            Extractions are cached outright since they only restate the resume. Sampled
+            report text (sampled defaults to no parse function) is reused only when
+            LLM_CACHE_SEED is set, so repeat runs keep getting fresh wording by default.
+            refresh skips the lookup but still stores the new response.
+            model is the client chain runs on.
+            """
+            if sampled is None:
+                sampled = parse is None
+            seed = os.getenv("LLM_CACHE_SEED", "")
+            temperature = getattr(model, "temperature", 0) or 0
+            if sampled and temperature > 0 and not seed:
+                return await guarded_ainvoke(chain, inputs)
+            key = llm_cache.make_key(
+                "hello", name, model.model_name, temperature, seed if sampled else "",
+                *(inputs[k] for k in sorted(inputs)),
+            )
+            cached = None if refresh else llm_cache.cache_get(key)
+            if cached is not None:
+                return cached
+            response = await guarded_ainvoke(chain, inputs)
+            if parse is None or parse(response) is not None:
+                llm_cache.cache_put(key, response)
+            return response
+
+        def parse_extraction(response):
+            """Extraction object from response, or None if it is not a JSON object"""
+            try:
+                data = _EXTRACTION_PARSER.parse(response)
+            except OutputParserException:
+                return None
+            return data if isinstance(data, dict) else None
+
+        def as_list(value):
+            return value if isinstance(value, list) else []
+
+        def dedupe_work_experience(work_exps):
             # Deduplicate experiences by (company, role, tenure, description) normalized
             seen = set()
             deduped = []
-            for item in work_exps if isinstance(work_exps, list) else []:
+            for item in work_exps:
+                if not isinstance(item, dict):
+                    continue
                 company = str(item.get("company", "")).strip().lower()
                 role = str(item.get("role", "")).strip().lower()
                 tenure = str(item.get("tenure", "")).strip().lower()
-                desc = re.sub(r"\s+", " ", str(item.get("description", "")).strip().lower())
+                desc = _WHITESPACE_RE.sub(" ", str(item.get("description", "")).strip().lower())
                 key = (company, role, tenure, desc)
                 if key in seen:
                     continue
                 seen.add(key)
                 deduped.append(item)
-            return {"work_experience_list": deduped}
+            return deduped
+
+        # Define node functions; they are async so independent branches overlap their Groq calls
+        async def extract_resume_node(state):
+            resume = {"resume_text": state["resume_text"]}
+            data = parse_extraction(await cached_ainvoke(
+                "resume_extraction", resume_extraction_chain, resume, parse=parse_extraction, model=extraction_llm
+            ))
+            if data is None:
+                # Everything downstream depends on this call, so retry an unusable response once
+                data = parse_extraction(await cached_ainvoke(
+                    "resume_extraction", resume_extraction_chain, resume, parse=parse_extraction, model=extraction_llm
+                )) or {}
+            return {
+                "projects_json": as_list(data.get("projects")),
+                "skills_list": as_list(data.get("skills")),
+                "work_experience_list": dedupe_work_experience(as_list(data.get("work_experience"))),
+            }
 
-        def skills_match_node(state):
-            response = skills_match_chain.invoke({
+        async def skills_match_node(state):
+            response = await cached_ainvoke("skills_match", skills_match_chain, {
                 "skills": state["skills_list"],
                 "jd": state["job_description"],
                 "target_role": state["target_role"]
             })
             return {"skills_match_report": response}
 
-        def role_relevance_node(state):
-            response = role_relevance_chain.invoke({
+        async def role_relevance_node(state):
+            response = await cached_ainvoke("role_relevance", role_relevance_chain, {
                 "current_role": state["current_role"],
                 "target_role": state["target_role"],
                 "resume_text": state.get("resume_text", ""),
@@ -287,95 +466,90 @@ class ResumeAnalyzer:
             })
             return {"role_relevance_report": response}
 
-        def work_experience_agent(state):
+        async def work_experience_agent(state):
             work_exp = state.get("work_experience_list", [])
             jd = state.get("job_description", "")
             target = state.get("target_role", "")
             
-            formatted_exp = json.dumps(work_exp, indent=2)
-            response = work_experience_rewrite_chain.invoke({
+            formatted_exp = _json_dumps(work_exp)
+            response = await cached_ainvoke("work_experience_rewrite", work_experience_rewrite_chain, {
                 "jd": jd,
                 "target_role": target,
                 "work_experience": formatted_exp
             })
             return {"work_experience_report": response}
 
-        def projects_agent(state):
+        async def projects_agent(state):
             projects = state.get("projects_json", [])
             jd = state.get("job_description", "")
             target = state.get("target_role", "")
             
-            formatted_projects = json.dumps(projects, indent=2)
-            response = project_rewrite_chain.invoke({
+            formatted_projects = _json_dumps(projects)
+            response = await cached_ainvoke("projects_rewrite", project_rewrite_chain, {
                 "jd": jd,
                 "target_role": target,
                 "projects": formatted_projects
             })
             return {"projects_report": response}
 
-        def generate_final_report_node(state):
-            skills = state.get("skills_match_report", "")
-            relevance = state.get("role_relevance_report", "")
-            projects = state.get("projects_report", "")
-            work_exp = state.get("work_experience_report", "")
-
-            final_report = f"""
-# 🧾 Final Career Analysis Report
-
----
-
-## ✅ Skills Match Report
-{skills}
-
----
-
-## 🎯 Role Relevance Report
-{relevance}
-
----
-
-## 💻 Enhancements to Projects (Aligned to JD & Target Role)
-{projects}
-
----
-
-## 💼 Enhancements to Work Experience (Aligned to JD & Target Role)
-{work_exp}
-
----
+        async def one_pass_node(state):
+            inputs = {
+                "resume_text": state["resume_text"],
+                "jd": state["job_description"],
+                "current_role": state["current_role"],
+                "target_role": state["target_role"],
+            }
+            data = parse_extraction(await cached_ainvoke(
+                "one_pass", one_pass_chain, inputs, parse=parse_extraction, sampled=True
+            ))
+            if data is None:
+                # Retry an unusable response once against Groq; a parseable retry is stored
+                data = parse_extraction(await cached_ainvoke(
+                    "one_pass", one_pass_chain, inputs, parse=parse_extraction, sampled=True, refresh=True
+                )) or {}
+            return {
+                field: str(data.get(field) or "❌ Section missing from the analysis")
+                for field, _ in _REPORT_SECTIONS
+            }
 
-### 📝 Summary
-- This report evaluates your readiness for the target role.
-- Use the suggestions to improve your fit and bridge any gaps.
-"""
+        def generate_final_report_node(state):
+            final_report = _REPORT_HEADER + "".join(
+                _report_section(title, state.get(field, "")) for field, title in _REPORT_SECTIONS
+            ) + _REPORT_FOOTER
             return {"final_markdown_report": final_report}
 
         # Build the graph
         builder = StateGraph(AgentState)
 
+        if one_pass:
+            builder.add_node("one_pass", one_pass_node)
+            builder.add_node("generate_final_report", generate_final_report_node)
+            builder.add_edge(START, "one_pass")
+            builder.add_edge("one_pass", "generate_final_report")
+            builder.set_finish_point("generate_final_report")
+            return builder.compile()
+
         # Add all nodes
-        builder.add_node("extract_projects", extract_projects_node)
-        builder.add_node("extract_skills", extract_skills_node)
-        builder.add_node("extract_work_experience", extract_work_experience_node)
+        builder.add_node("extract_resume", extract_resume_node)
         builder.add_node("skills_match", skills_match_node)
         builder.add_node("role_relevance", role_relevance_node)
         builder.add_node("projects_agent", projects_agent)
         builder.add_node("work_experience_agent", work_experience_agent)
         builder.add_node("generate_final_report", generate_final_report_node)
 
-        # Set entry point
-        builder.set_entry_point("extract_projects")
+        # Set entry points; role relevance only needs the raw inputs, so it starts right away
+        builder.add_edge(START, "extract_resume")
+        builder.add_edge(START, "role_relevance")
 
         # Define edges
-        builder.add_edge("extract_projects", "extract_skills")
-        builder.add_edge("extract_projects", "extract_work_experience")
-        builder.add_edge("extract_projects", "projects_agent")
-        builder.add_edge("extract_work_experience", "work_experience_agent")
-        builder.add_edge("extract_skills", "skills_match")
-        builder.add_edge("skills_match", "role_relevance")
-        builder.add_edge("role_relevance", "generate_final_report")
-        builder.add_edge("projects_agent", "generate_final_report")
-        builder.add_edge("work_experience_agent", "generate_final_report")
+        builder.add_edge("extract_resume", "skills_match")
+        builder.add_edge("extract_resume", "projects_agent")
+        builder.add_edge("extract_resume", "work_experience_agent")
+        # Wait for every branch so the report is assembled once, with all sections
+        builder.add_edge(
+            ["skills_match", "role_relevance", "projects_agent", "work_experience_agent"],
+            "generate_final_report",
+        )
 
         # Set final node
         builder.set_finish_point("generate_final_report")
@@ -384,6 +558,17 @@ class ResumeAnalyzer:
 
     def analyze_resume(self, resume_text: str, job_description: str, 
                       current_role: str, target_role: str, experience: str) -> str:
+        """Blocking wrapper around analyze_resume_async"""
+        return _run_async(self.analyze_resume_async(
+            resume_text=resume_text,
+            job_description=job_description,
+            current_role=current_role,
+            target_role=target_role,
+            experience=experience
+        ))
+
+    async def analyze_resume_async(self, resume_text: str, job_description: str,
+                                   current_role: str, target_role: str, experience: str) -> str:
         """
         Analyze resume and return markdown report
         
@@ -397,12 +582,12 @@ class ResumeAnalyzer:
         Returns:
             str: Markdown formatted analysis report
         """
-        if not resume_text or not job_description:
-            return "❌ Please provide both resume text and job description."
+        if _missing_inputs(resume_text, job_description):
+            return _MISSING_INPUTS_MESSAGE
         
         try:
             # Run the graph
-            final_state = self.graph.invoke({
+            final_state = await self.graph.ainvoke({
                 "resume_text": resume_text,
                 "job_description": job_description,
                 "current_role": current_role,
@@ -415,21 +600,79 @@ class ResumeAnalyzer:
         except Exception as e:
             return f"❌ Error during analysis: {str(e)}"
 
+    async def analyze_resume_stream(self, resume_text: str, job_description: str,
+                                    current_role: str, target_role: str, experience: str) -> AsyncIterator[str]:
+        """
+        Yield the markdown report piece by piece: the header, then each section as soon
+        as the node producing it finishes (so in completion order), then the summary.
+        """
+        if _missing_inputs(resume_text, job_description):
+            yield _MISSING_INPUTS_MESSAGE
+            return
+
+        yield _REPORT_HEADER
+        titles = dict(_REPORT_SECTIONS)
+        try:
+            async for update in self.graph.astream({
+                "resume_text": resume_text,
+                "job_description": job_description,
+                "current_role": current_role,
+                "target_role": target_role,
+                "experience": experience
+            }, stream_mode="updates"):
+                for values in update.values():
+                    for field, value in (values or {}).items():
+                        if field in titles:
+                            yield _report_section(titles[field], value)
+        except Exception as e:
+            yield f"❌ Error during analysis: {str(e)}"
+            return
+        yield _REPORT_FOOTER
+
+
+@functools.lru_cache(maxsize=4)
+def _get_graph(groq_api_key: str, model_name: str, extraction_model: str, one_pass: bool = False):
+    return ResumeAnalyzer._build_graph(
+        _get_llm(groq_api_key, model_name), _get_llm(groq_api_key, extraction_model), one_pass
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _get_analyzer(groq_api_key: str) -> ResumeAnalyzer:
+    """Shared analyzer per API key, so repeat requests skip client and graph lookups.
+    Model and mode env vars are read when a key is first seen."""
+    return ResumeAnalyzer(groq_api_key=groq_api_key)
+
 
 def main(resume_text=None, job_description=None, current_role=None, target_role=None, experience=None, groq_api_key=None):
+    return _run_async(amain(
+        resume_text=resume_text,
+        job_description=job_description,
+        current_role=current_role,
+        target_role=target_role,
+        experience=experience,
+        groq_api_key=groq_api_key
+    ))
+
+
+async def amain(resume_text=None, job_description=None, current_role=None, target_role=None, experience=None, groq_api_key=None):
+    """Async form of main: the report text, or an error message in its place"""
     # Check if all required parameters are provided
     if not all([resume_text, job_description, current_role, target_role, experience, groq_api_key]):
-        print("Missing required parameters")
+        log.debug("Missing required parameters")
         return "❌ Error: Missing required parameters. Please provide resume text, job description, current role, target role, experience, and groq_api_key."
+    # Nothing to analyze: answer before any client or graph is set up
+    if _missing_inputs(resume_text, job_description):
+        return _MISSING_INPUTS_MESSAGE
     
     try:
-        print("Initializing ResumeAnalyzer...")
-        # Initialize analyzer with Groq API key passed as parameter
-        analyzer = ResumeAnalyzer(groq_api_key=groq_api_key)
+        log.debug("Initializing ResumeAnalyzer...")
+        # Reuse the analyzer for this Groq API key (built on first use)
+        analyzer = _get_analyzer(groq_api_key)
         
-        print("Starting resume analysis...")
+        log.debug("Starting resume analysis...")
         # Analyze resume
-        result = analyzer.analyze_resume(
+        result = await analyzer.analyze_resume_async(
             resume_text=resume_text,
             job_description=job_description,
             current_role=current_role,
@@ -437,25 +680,145 @@ def main(resume_text=None, job_description=None, current_role=None, target_role=
             experience=experience
         )
         
-        print("Analysis completed successfully")
+        log.debug("Analysis completed successfully")
         return result
     except Exception as e:
-        import traceback
-        print(f"Error during analysis: {str(e)}")
-        print(traceback.format_exc())
+        log.exception("Error during analysis")
         return f"❌ Error: {str(e)}"
 
 
+def _server_concurrency() -> int:
+    try:
+        return max(1, int(os.getenv("RESUME_ANALYZER_CONCURRENCY", "4")))
+    except ValueError:
+        return 4
+
+
+def _write_json(obj: Any) -> None:
+    """Write obj to stdout as a single JSON line and flush."""
+    buffer = getattr(sys.stdout, "buffer", None)
+    if orjson is not None and buffer is not None:
+        sys.stdout.flush()
+        buffer.write(orjson.dumps(obj) + b"\n")
+        buffer.flush()
+    else:
+        sys.stdout.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
+async def _handle_line(line: str) -> Dict[str, Any]:
+    try:
+        req = _json_loads(line)
+        if not isinstance(req, dict):
+            raise ValueError("request must be a JSON object")
+    except ValueError as e:
+        return {"error": str(e)}
+    report = await amain(
+        resume_text=req.get("resume_text"),
+        job_description=req.get("job_description"),
+        current_role=req.get("current_role"),
+        target_role=req.get("target_role"),
+        experience=req.get("experience"),
+        groq_api_key=req.get("groq_api_key") or os.getenv("GROQ_API_KEY")
+    )
+    resp = {"report": report}
+    if "id" in req:
+        resp["id"] = req["id"]
+    return resp
+
+
+async def _serve() -> None:
+    loop = asyncio.get_running_loop()
+    lines: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+
+    def _read_stdin() -> None:
+        for line in sys.stdin:
+            loop.call_soon_threadsafe(lines.put_nowait, line)
+        loop.call_soon_threadsafe(lines.put_nowait, None)
+
+    # Daemon thread so a blocked readline never holds up shutdown
+    threading.Thread(target=_read_stdin, name="stdin-reader", daemon=True).start()
+    # SIGTERM stops intake; analyses already in flight still get their response
+    signal.signal(signal.SIGTERM, lambda signum, frame: loop.call_soon_threadsafe(lines.put_nowait, None))
+
+    sem = asyncio.Semaphore(_server_concurrency())
+    in_flight = set()
+
+    async def _run(line: str) -> None:
+        async with sem:
+            resp = await _handle_line(line)
+        # Responses are written from the loop thread only, so lines never interleave
+        _write_json(resp)
+
+    while True:
+        line = await lines.get()
+        if line is None:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        task = asyncio.create_task(_run(line))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+
+def serve() -> None:
+    """Worker mode: read one JSON request per line on stdin, write one JSON response per line.
+
+    A request carries resume_text, job_description, current_role, target_role, experience
+    and optionally groq_api_key (else GROQ_API_KEY); the response is {"report": ...}, with
+    any "id" echoed back. Imports, clients and the compiled graph stay warm across requests,
+    and up to RESUME_ANALYZER_CONCURRENCY (default 4) analyses run at once, so responses
+    may arrive out of order.
+    """
+    _run_async(_serve())
+
+
+def stream_main(resume_text, job_description, current_role, target_role, experience, groq_api_key):
+    """Write the report to stdout section by section as the analysis progresses"""
+    if not all([resume_text, job_description, current_role, target_role, experience, groq_api_key]):
+        print("❌ Error: Missing required parameters. Please provide resume text, job description, current role, target role, experience, and groq_api_key.")
+        return
+    if _missing_inputs(resume_text, job_description):
+        print(_MISSING_INPUTS_MESSAGE)
+        return
+
+    async def _write():
+        analyzer = _get_analyzer(groq_api_key)
+        async for chunk in analyzer.analyze_resume_stream(
+            resume_text=resume_text,
+            job_description=job_description,
+            current_role=current_role,
+            target_role=target_role,
+            experience=experience
+        ):
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+
+    _run_async(_write())
+
+
 if __name__ == "__main__":
+    level = logging.getLevelName(os.getenv("LOG_LEVEL", "WARNING").strip().upper())
+    logging.basicConfig(level=level if isinstance(level, int) else logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    if "--server" in sys.argv[1:]:
+        serve()
     # Check if arguments were passed
-    if len(sys.argv) > 6:  # All required parameters including GROQ_API_KEY
-        print(main(
+    elif len(sys.argv) > 6:  # All required parameters including GROQ_API_KEY
+        args = dict(
             resume_text=sys.argv[1],
             job_description=sys.argv[2],
             current_role=sys.argv[3],
             target_role=sys.argv[4],
             experience=sys.argv[5],
             groq_api_key=sys.argv[6]
-        ))
+        )
+        # Opt-in: the default output is the complete report, printed once
+        if "--stream" in sys.argv[7:]:
+            stream_main(**args)
+        else:
+            print(main(**args))
     else:
         print("❌ Error: Missing required parameters. Please provide resume text, job description, current role, target role, experience, and groq_api_key.")
\ No newline at end of file
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encode/decode
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:  # optional: faster cache-key hashing
+    xxhash = None
+
+# Exact-match response cache shared by the interview scripts.
+# Entries are keyed by a 128-bit digest over the inputs that determine an LLM
+# response, so a repeated request skips the Groq round-trip entirely.
+# Configure with LLM_CACHE_PATH, LLM_CACHE_TTL (seconds) and LLM_CACHE_DISABLED.
+# A small in-process LRU sits in front of SQLite so a long-lived worker
+# (ai_interview.py --server) answers repeat lookups without touching disk.
+
+_DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".llm_cache.sqlite3")
+_DEFAULT_TTL = 7 * 24 * 3600
+_MEMORY_SIZE = 256
+
+_conn: Optional[sqlite3.Connection] = None
+# Guards _conn and _memory; callers may use the cache from worker threads
+_lock = threading.RLock()
+# key -> (encoded value, created_at), most recently used last
+_memory: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+
+
+def _enabled() -> bool:
+    return os.getenv("LLM_CACHE_DISABLED", "").strip().lower() not in ("1", "true", "yes")
+
+
+def _ttl() -> int:
+    try:
+        return int(os.getenv("LLM_CACHE_TTL", _DEFAULT_TTL))
+    except ValueError:
+        return _DEFAULT_TTL
+
+
+def _connect() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(os.getenv("LLM_CACHE_PATH", _DEFAULT_PATH), timeout=5, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at INTEGER NOT NULL)"
+        )
+        conn.commit()
+        _conn = conn
+    return _conn
+
+
+def _dumps(value: Any) -> str:
+    return orjson.dumps(value).decode() if orjson is not None else json.dumps(value)
+
+
+def _loads(value: str) -> Any:
+    return orjson.loads(value) if orjson is not None else json.loads(value)
+
+
+def _remember(key: str, value: str, created_at: int) -> None:
+    _memory[key] = (value, created_at)
+    _memory.move_to_end(key)
+    while len(_memory) > _MEMORY_SIZE:
+        _memory.popitem(last=False)
+
+
+def make_key(*parts: Any) -> str:
+    """Return a stable cache key for the given parts.
+
+    Whitespace inside each part is collapsed so trivially different PDF
+    extractions of the same resume map to the same entry.
+    """
+    # Keys only need to be stable and collision-resistant, not cryptographic
+    h = xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(" ".join(str(part).split()).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def cache_get(key: str, max_age: Optional[int] = None) -> Optional[Any]:
+    """Return the cached value for key, or None on miss/expiry/error.
+
+    max_age (seconds) overrides LLM_CACHE_TTL for entries that stay valid longer.
+    """
+    if not _enabled():
+        return None
+    try:
+        with _lock:
+            row = _memory.get(key)
+            if row is None:
+                row = _connect().execute(
+                    "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+            value, created_at = row
+            if time.time() - created_at > (_ttl() if max_age is None else max_age):
+                _memory.pop(key, None)
+                return None
+            _remember(key, value, created_at)
+        return _loads(value)
+    except Exception:
+        return None
+
+
+def cache_put(key: str, value: Any) -> None:
+    """Store a JSON-serializable value; failures are ignored (best effort)."""
+    if not _enabled():
+        return
+    try:
+        encoded, created_at = _dumps(value), int(time.time())
+        with _lock:
+            _remember(key, encoded, created_at)
+            conn = _connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, encoded, created_at),
+            )
+            conn.commit()
+    except Exception:
+        pass
@@ -0,0 +1,76 @@
+import json
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encode/decode
+    orjson = None
+
+# Incremental parser for streamed question-generation responses, shared by the
+# interview scripts' --stream modes.
+
+
+def _loads(text: str) -> Any:
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+class McqStreamParser:
+    """Incrementally scan streamed JSON text and return each completed entry of "mcq_questions".
+
+    Tracks brace depth and string/escape state so a question can be surfaced as soon
+    as its closing brace arrives, without waiting for the rest of the response.
+    `closed` becomes True once the top-level object holding "mcq_questions" ends.
+    """
+
+    def __init__(self):
+        self.closed = False
+        self._saw_mcq = False
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._str: List[str] = []
+        self._key = ""
+        self._in_mcq = False
+        self._obj: Optional[List[str]] = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        done = []
+        for ch in chunk:
+            if self._obj is not None:
+                self._obj.append(ch)
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif ch == "\\":
+                    self._esc = True
+                elif ch == '"':
+                    self._in_str = False
+                    if self._depth == 1:
+                        self._key = "".join(self._str)
+                elif self._depth == 1:
+                    self._str.append(ch)
+                continue
+            if ch == '"':
+                self._in_str = True
+                self._str = []
+            elif ch in "{[":
+                if ch == "[" and self._depth == 1:
+                    self._in_mcq = self._key == "mcq_questions"
+                    self._saw_mcq = self._saw_mcq or self._in_mcq
+                self._depth += 1
+                if ch == "{" and self._depth == 3 and self._in_mcq:
+                    self._obj = ["{"]
+            elif ch in "}]":
+                self._depth -= 1
+                if self._obj is not None and self._depth == 2:
+                    try:
+                        done.append(_loads("".join(self._obj)))
+                    except ValueError:
+                        pass
+                    self._obj = None
+                elif self._depth == 1:
+                    self._in_mcq = False
+                elif self._depth == 0 and self._saw_mcq:
+                    self.closed = True
+                    break
+        return done
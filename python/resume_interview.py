@@ -1,16 +1,29 @@
 import argparse
+import asyncio
+import atexit
+import functools
 import json
 import os
 import random
-from typing import List, Dict, Any
+import re
+import sys
+from typing import Any, Callable, Dict, List, Optional
 
-from langgraph.graph import StateGraph
+import httpx
 from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate
-import json
+
+import llm_cache
+from mcq_stream import McqStreamParser
 
 from typing import TypedDict
 
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encode/decode
+    orjson = None
+
+
 class ResumeInterviewState(TypedDict, total=False):
     # Input data
     resume_text: str
@@ -19,6 +32,7 @@ class ResumeInterviewState(TypedDict, total=False):
     experience: str
     current_role: str
     focus_area: str  # "skills" | "projects" | "work_experience"
+    round: str  # "1".."4"; rounds 3 and 4 use the managerial and hr templates
     
     # Extracted content
     extracted_skills: Dict[str, Any]
@@ -40,9 +54,9 @@ class ResumeInterviewState(TypedDict, total=False):
 def _resolve_groq_model() -> str:
     """Return a supported Groq model name, remapping deprecated aliases if needed."""
     alias_map = {
-        "llama3-70b-8192": "llama-3.1-70b-versatile",
+        "llama3-70b-8192": "llama-3.3-70b-versatile",
         "llama3-8b-8192": "llama-3.1-8b-instant",
-        "llama3-70b": "llama-3.1-70b-versatile",
+        "llama3-70b": "llama-3.3-70b-versatile",
         "llama3-8b": "llama-3.1-8b-instant",
     }
     env_model = os.getenv("GROQ_MODEL")
@@ -51,37 +65,56 @@ def _resolve_groq_model() -> str:
     return "llama-3.1-8b-instant"
 
 
+def _json_loads(text: str) -> Any:
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def _write_json(obj: Any) -> None:
+    """Write obj to stdout as a single JSON line and flush."""
+    buffer = getattr(sys.stdout, "buffer", None)
+    if orjson is not None and buffer is not None:
+        sys.stdout.flush()
+        buffer.write(orjson.dumps(obj) + b"\n")
+        buffer.flush()
+    else:
+        sys.stdout.write(json.dumps(obj) + "\n")
+        sys.stdout.flush()
+
+
+# Fenced blocks in a response (a ```json fence is preferred over the first plain one);
+# an unterminated fence runs to the end of the text
+_JSON_FENCE_RE = re.compile(r"```json\s*(.*?)\s*(?:```|$)", re.S)
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*(?:```|$)", re.S)
+
+
+# Successive segments of the text delimited by ``` fences, minus any "json" language tag
+_FENCE_SEGMENT_RE = re.compile(r"(?:```|^)(?:json)?\s*(.*?)\s*(?=```|$)", re.S)
+
+
 def _safe_json(text: str):
     """Safely parse JSON from LLM response."""
+    if "```" in text:
+        # Stop at the first segment that parses instead of splitting the whole text
+        for m in _FENCE_SEGMENT_RE.finditer(text):
+            segment = m.group(1)
+            if segment.startswith(("{", "[")):
+                try:
+                    return _json_loads(segment)
+                except Exception:
+                    continue
     try:
-        if "```" in text:
-            parts = text.split("```")
-            for p in parts:
-                p = p.strip()
-                if p.startswith("{") or p.startswith("["):
-                    return json.loads(p)
-        return json.loads(text)
+        return _json_loads(text)
     except Exception:
         return None
 
 
-def build_resume_interview_graph() -> StateGraph:
-    """Build the multi-agent graph for resume-based interview question generation."""
-    
-    if "GROQ_API_KEY" not in os.environ:
-        raise RuntimeError("GROQ_API_KEY environment variable is not set.")
+# Prompt templates, compiled once at import rather than on every agent call.
+# Static instructions come first and per-request inputs last.
+# The two extraction prompts ask for every section regardless of focus area (later
+# agents pick the focus), so their cached results serve every round and focus area.
 
-    llm = ChatGroq(temperature=0.7, model_name=_resolve_groq_model(), max_tokens=2048)
-    
-    def content_extraction_agent(state: dict):
-        """Agent 1: Extract all relevant content from resume based on focus area."""
-        
-        extract_prompt = ChatPromptTemplate.from_template("""
-        Extract structured information from the following resume text.
-        Focus Area: {focus_area}
-        
-        Resume Text:
-        {resume_text}
+_CONTENT_EXTRACTION_PROMPT = ChatPromptTemplate.from_template("""
+        Extract structured information from the resume text below.
         
         Return STRICT JSON with the following structure:
         {{
@@ -115,26 +148,13 @@ def build_resume_interview_graph() -> StateGraph:
                 }}
             ]
         }}
-        """)
-        
-        result = llm.predict(extract_prompt.format(**state))
-        data = _safe_json(result) or {}
         
-        state["extracted_skills"] = data.get("skills", {})
-        state["extracted_projects"] = data.get("projects", [])
-        state["extracted_work_experience"] = data.get("work_experience", [])
-        
-        return state
+        Resume Text:
+        {resume_text}
+        """)
 
-    def job_requirements_analysis_agent(state: dict):
-        """Agent 2: Analyze job description to extract requirements relevant to focus area."""
-        
-        analysis_prompt = ChatPromptTemplate.from_template("""
-        Analyze the job description and extract requirements relevant to: {focus_area}
-        
-        Job Description:
-        {job_desc}
-        Target Role: {target_role}
+_JOB_REQUIREMENTS_PROMPT = ChatPromptTemplate.from_template("""
+        Analyze the job description below and extract its skills, project and experience requirements.
         
         Return STRICT JSON:
         {{
@@ -158,181 +178,89 @@ def build_resume_interview_graph() -> StateGraph:
                 "company_types": ["startup", "enterprise"]
             }}
         }}
-        """)
         
-        result = llm.predict(analysis_prompt.format(**state))
-        data = _safe_json(result) or {}
-        
-        state["job_requirements"] = data
-        return state
-
-    def focus_content_processing_agent(state: dict):
-        """Agent 3: Process and structure content based on selected focus area."""
-        
-        focus_area = state.get("focus_area", "skills")
-        
-        if focus_area == "skills":
-            state["focus_content"] = {
-                "type": "skills",
-                "content": state.get("extracted_skills", {}),
-                "context": f"Candidate has {state.get('experience', '0')} years of experience"
-            }
-        
-        elif focus_area == "projects":
-            projects = state.get("extracted_projects", [])
-            # Select most relevant projects (max 3-4 for focused questions)
-            selected_projects = projects[:4] if len(projects) > 4 else projects
-            state["focus_content"] = {
-                "type": "projects", 
-                "content": selected_projects,
-                "context": f"Targeting {state.get('target_role', '')} role"
-            }
-        
-        elif focus_area == "work_experience":
-            experience = state.get("extracted_work_experience", [])
-            state["focus_content"] = {
-                "type": "work_experience",
-                "content": experience,
-                "context": f"Transitioning from {state.get('current_role', '')} to {state.get('target_role', '')}"
-            }
-        
-        return state
-
-    def gap_analysis_matching_agent(state: dict):
-        """Agent 4: Analyze gaps and matches between resume content and job requirements."""
-        
-        focus_area = state.get("focus_area")
-        focus_content = state.get("focus_content", {})
-        job_requirements = state.get("job_requirements", {})
-        
-        analysis_prompt = ChatPromptTemplate.from_template("""
-        Perform gap analysis between candidate's {focus_area} and job requirements.
-        
-        Candidate's {focus_area}:
-        {focus_content}
-        
-        Job Requirements:
-        {job_requirements}
+        Target Role: {target_role}
         
-        Return STRICT JSON:
-        {{
-            "strengths": [
-                {{
-                    "area": "specific strength",
-                    "evidence": "supporting evidence from resume",
-                    "relevance": "how it matches job requirement"
-                }}
-            ],
-            "gaps": [
-                {{
-                    "area": "missing skill/experience",
-                    "requirement": "what job needs",
-                    "impact": "how critical this gap is"
-                }}
-            ],
-            "opportunities": [
-                {{
-                    "area": "area to explore",
-                    "reason": "why this is worth exploring",
-                    "question_angle": "how to frame questions around this"
-                }}
-            ]
-        }}
+        Job Description:
+        {job_desc}
         """)
-        
-        result = llm.predict(analysis_prompt.format(
-            focus_area=focus_area,
-            focus_content=json.dumps(focus_content, indent=2),
-            job_requirements=json.dumps(job_requirements, indent=2)
-        ))
-        
-        data = _safe_json(result) or {}
-        state["gap_analysis"] = data
-        
-        return state
 
-    def strategy_planning_agent(state: dict):
-        """Agent 5: Plan question generation strategy based on focus area and gap analysis."""
-        
-        focus_area = state.get("focus_area")
-        gap_analysis = state.get("gap_analysis", {})
-        
-        strategy_prompt = ChatPromptTemplate.from_template("""
-        Create a question generation strategy for {focus_area}-focused interview.
-        
-        Gap Analysis:
-        {gap_analysis}
-        
-        Target Role: {target_role}
-        Experience: {experience} years
+_GAP_STRATEGY_PROMPT = ChatPromptTemplate.from_template("""
+        Perform a gap analysis between the candidate's content and the job requirements below,
+        then use that analysis to create a question generation strategy for an interview
+        focused on the given focus area.
         
-        Return STRICT JSON strategy:
+        Return STRICT JSON:
         {{
-            "mcq_strategy": {{
-                "strength_validation": {{
-                    "count": 3,
-                    "areas": ["area1", "area2", "area3"],
-                    "difficulty": "appropriate level",
-                    "approach": "how to validate these strengths"
-                }},
-                "gap_assessment": {{
-                    "count": 2, 
-                    "areas": ["gap1", "gap2"],
-                    "difficulty": "diagnostic level",
-                    "approach": "how to assess these gaps"
-                }}
+            "gap_analysis": {{
+                "strengths": [
+                    {{
+                        "area": "specific strength",
+                        "evidence": "supporting evidence from resume",
+                        "relevance": "how it matches job requirement"
+                    }}
+                ],
+                "gaps": [
+                    {{
+                        "area": "missing skill/experience",
+                        "requirement": "what job needs",
+                        "impact": "how critical this gap is"
+                    }}
+                ],
+                "opportunities": [
+                    {{
+                        "area": "area to explore",
+                        "reason": "why this is worth exploring",
+                        "question_angle": "how to frame questions around this"
+                    }}
+                ]
             }},
-            "descriptive_strategy": {{
-                "scenario_based": {{
-                    "count": 2,
-                    "scenarios": ["scenario type 1", "scenario type 2"],
-                    "focus": "what to evaluate"
+            "question_strategy": {{
+                "mcq_strategy": {{
+                    "strength_validation": {{
+                        "count": 3,
+                        "areas": ["area1", "area2", "area3"],
+                        "difficulty": "appropriate level",
+                        "approach": "how to validate these strengths"
+                    }},
+                    "gap_assessment": {{
+                        "count": 2, 
+                        "areas": ["gap1", "gap2"],
+                        "difficulty": "diagnostic level",
+                        "approach": "how to assess these gaps"
+                    }}
                 }},
-                "deep_dive": {{
-                    "count": 1,
-                    "area": "most critical area to explore",
-                    "approach": "how to structure this question"
+                "descriptive_strategy": {{
+                    "scenario_based": {{
+                        "count": 2,
+                        "scenarios": ["scenario type 1", "scenario type 2"],
+                        "focus": "what to evaluate"
+                    }},
+                    "deep_dive": {{
+                        "count": 1,
+                        "area": "most critical area to explore",
+                        "approach": "how to structure this question"
+                    }}
                 }}
             }}
         }}
-        """)
         
-        result = llm.predict(strategy_prompt.format(
-            focus_area=focus_area,
-            gap_analysis=json.dumps(gap_analysis, indent=2),
-            target_role=state.get('target_role', ''),
-            experience=state.get('experience', '')
-        ))
+        Focus Area: {focus_area}
+        Target Role: {target_role}
+        Experience: {experience} years
         
-        data = _safe_json(result) or {}
-        state["question_strategy"] = data
+        Candidate's {focus_area}:
+        {focus_content}
         
-        return state
+        Job Requirements:
+        {job_requirements}
+        """)
 
-    def question_generation_agent(state: dict):
-        """Agent 6: Generate targeted questions based on strategy and focus area."""
-        
-        focus_area = state.get("focus_area")
-        round_str = str(state.get("round", "1")).strip()
-        try:
-            round_num = int(round_str)
-        except Exception:
-            round_num = 1
-        
-        # Prompt templates
-        prompts = {
-            "skills": """
+# Question-generation templates: technical rounds by focus area, plus managerial and hr
+_QUESTION_PROMPTS = {
+    "skills": """
             You are an experienced technical interviewer. Generate interview questions focused on SKILLS assessment based on the candidate's actual resume.
             
-            CANDIDATE'S SKILLS FROM RESUME:
-            {focus_content}
-            
-            JOB REQUIREMENTS:
-            {job_requirements}
-            
-            TARGET ROLE: {target_role}
-            EXPERIENCE: {experience} years
-            
             INSTRUCTIONS:
             - Create questions that test SPECIFIC technologies and skills from their resume
             - Make questions sound like a real interviewer who has read their resume
@@ -383,12 +311,8 @@ def build_resume_interview_graph() -> StateGraph:
                 "How do you stay updated with new technologies and best practices in your field?"
               ]
             }}
-            """,
             
-            "projects": """
-            You are an experienced technical interviewer. Generate interview questions focused on PROJECT experience based on the candidate's actual projects.
-            
-            CANDIDATE'S PROJECTS:
+            CANDIDATE'S SKILLS FROM RESUME:
             {focus_content}
             
             JOB REQUIREMENTS:
@@ -396,6 +320,10 @@ def build_resume_interview_graph() -> StateGraph:
             
             TARGET ROLE: {target_role}
             EXPERIENCE: {experience} years
+    """,
+            
+    "projects": """
+            You are an experienced technical interviewer. Generate interview questions focused on PROJECT experience based on the candidate's actual projects.
             
             INSTRUCTIONS:
             - Reference their actual project names and technologies when possible
@@ -441,12 +369,8 @@ def build_resume_interview_graph() -> StateGraph:
                 "Describe how you handled project requirements that changed during development. What was your process?"
               ]
             }}
-            """,
-            
-            "work_experience": """
-            You are an experienced HR interviewer. Generate interview questions focused on WORK EXPERIENCE based on the candidate's actual work history.
             
-            CANDIDATE'S WORK EXPERIENCE:
+            CANDIDATE'S PROJECTS:
             {focus_content}
             
             JOB REQUIREMENTS:
@@ -454,6 +378,10 @@ def build_resume_interview_graph() -> StateGraph:
             
             TARGET ROLE: {target_role}
             EXPERIENCE: {experience} years
+    """,
+            
+    "work_experience": """
+            You are an experienced HR interviewer. Generate interview questions focused on WORK EXPERIENCE based on the candidate's actual work history.
             
             INSTRUCTIONS:
             - Reference their actual companies and roles when possible
@@ -499,19 +427,19 @@ def build_resume_interview_graph() -> StateGraph:
                 "How do you approach working with difficult team members or stakeholders?"
               ]
             }}
-            """,
-            "managerial": """
-            You are an experienced ENGINEERING MANAGER interviewer. Generate interview questions focused ONLY on MANAGERIAL competencies.
-            Do NOT ask technical or coding questions. Focus strictly on leadership and people/process management.
             
-            CANDIDATE CONTEXT:
+            CANDIDATE'S WORK EXPERIENCE:
             {focus_content}
             
-            ROLE CONTEXT AND REQUIREMENTS:
+            JOB REQUIREMENTS:
             {job_requirements}
             
             TARGET ROLE: {target_role}
             EXPERIENCE: {experience} years
+    """,
+    "managerial": """
+            You are an experienced ENGINEERING MANAGER interviewer. Generate interview questions focused ONLY on MANAGERIAL competencies.
+            Do NOT ask technical or coding questions. Focus strictly on leadership and people/process management.
             
             INSTRUCTIONS:
             - Emphasize leadership, team management, stakeholder management, hiring, performance reviews, coaching/mentoring
@@ -521,9 +449,9 @@ def build_resume_interview_graph() -> StateGraph:
             
             Generate EXACTLY 5 MCQ questions and 3 descriptive questions.
             Return ONLY valid JSON in this exact format:
-            {
+            {{
               "mcq_questions": [
-                {
+                {{
                   "question": "What is the most effective first step when resolving a conflict between two senior engineers?",
                   "options": [
                     "A. Escalate to HR immediately",
@@ -532,8 +460,8 @@ def build_resume_interview_graph() -> StateGraph:
                     "D. Ignore it and focus on delivery"
                   ],
                   "answer": "B"
-                },
-                {
+                }},
+                {{
                   "question": "When a project is at risk due to scope creep, what should a manager prioritize?",
                   "options": [
                     "A. Extend working hours",
@@ -542,20 +470,16 @@ def build_resume_interview_graph() -> StateGraph:
                     "D. Freeze all new features without discussion"
                   ],
                   "answer": "B"
-                }
+                }}
               ],
               "desc_questions": [
                 "Describe a time you had to balance delivery pressure with team well-being. How did you approach it?",
                 "How do you handle a high-performing engineer who is disruptive to team culture?",
                 "Explain your approach to performance management and growth plans for your reports."
               ]
-            }
-            """,
-            "hr": """
-            You are an HR interviewer. Generate interview questions focused ONLY on HR themes (culture fit, motivation, values, communication, ethics).
-            Do NOT ask technical or managerial process questions.
+            }}
             
-            CANDIDATE BACKGROUND:
+            CANDIDATE CONTEXT:
             {focus_content}
             
             ROLE CONTEXT AND REQUIREMENTS:
@@ -563,6 +487,10 @@ def build_resume_interview_graph() -> StateGraph:
             
             TARGET ROLE: {target_role}
             EXPERIENCE: {experience} years
+    """,
+    "hr": """
+            You are an HR interviewer. Generate interview questions focused ONLY on HR themes (culture fit, motivation, values, communication, ethics).
+            Do NOT ask technical or managerial process questions.
             
             INSTRUCTIONS:
             - Focus on values, collaboration style, communication, resilience, motivation, long-term goals
@@ -571,9 +499,9 @@ def build_resume_interview_graph() -> StateGraph:
             
             Generate EXACTLY 5 MCQ questions and 3 descriptive questions.
             Return ONLY valid JSON in this exact format:
-            {
+            {{
               "mcq_questions": [
-                {
+                {{
                   "question": "Which action best demonstrates ownership in a team setting?",
                   "options": [
                     "A. Waiting for explicit instructions",
@@ -582,8 +510,8 @@ def build_resume_interview_graph() -> StateGraph:
                     "D. Delegating without follow-up"
                   ],
                   "answer": "B"
-                },
-                {
+                }},
+                {{
                   "question": "What is the most appropriate response to constructive feedback?",
                   "options": [
                     "A. Justify your approach",
@@ -592,148 +520,29 @@ def build_resume_interview_graph() -> StateGraph:
                     "D. Ignore and continue"
                   ],
                   "answer": "C"
-                }
+                }}
               ],
               "desc_questions": [
                 "Tell me about a time you faced a significant setback. How did you handle it and what did you learn?",
                 "Describe your ideal team culture and how you contribute to building it.",
                 "What motivates you in your career, and how do you maintain that motivation over time?"
               ]
-            }
-            """
-        }
-        
-        # Select prompt based on round
-        if round_num == 3:
-            prompt_template = prompts["managerial"]
-        elif round_num == 4:
-            prompt_template = prompts["hr"]
-        else:
-            # Technical rounds (1 and 2) use existing focus_area mapping
-            prompt_template = prompts.get(focus_area, prompts["skills"])
-        prompt = ChatPromptTemplate.from_template(prompt_template)
-        
-        try:
-            result = llm.predict(prompt.format(**state))
-            
-            # Simple JSON parsing with fallback
-            try:
-                if "```json" in result:
-                    json_part = result.split("```json")[1].split("```")[0]
-                    data = json.loads(json_part)
-                elif "```" in result:
-                    json_part = result.split("```")[1]
-                    if json_part.startswith("json"):
-                        json_part = json_part[4:]
-                    data = json.loads(json_part)
-                else:
-                    data = json.loads(result)
-            except:
-                # If JSON parsing fails, return error
-                state["questions"] = {
-                    "error": "Failed to parse questions from AI response",
-                    "raw_response": result[:500]
-                }
-                return state
-
-            # Validate structure
-            if not isinstance(data, dict):
-                state["questions"] = {"error": "Invalid response format"}
-                return state
-                
-            mcq_questions = data.get("mcq_questions", [])
-            desc_questions = data.get("desc_questions", [])
+            }}
             
-            # Validate MCQ questions
-            validated_mcq = []
-            for mcq in mcq_questions[:5]:  # Take only first 5
-                if not isinstance(mcq, dict):
-                    continue
-                question = mcq.get("question", "").strip()
-                options = mcq.get("options", [])
-                answer = mcq.get("answer", "A").strip().upper()
-                
-                if not question or not options or len(options) != 4:
-                    continue
-                    
-                if answer not in ["A", "B", "C", "D"]:
-                    answer = "A"
-                    
-                validated_mcq.append({
-                    "question": question,
-                    "options": options,
-                    "answer": answer
-                })
-            
-            # Validate descriptive questions
-            validated_desc = []
-            for desc in desc_questions[:3]:  # Take only first 3
-                if isinstance(desc, str) and desc.strip():
-                    validated_desc.append(desc.strip())
-            
-            # Ensure we have the right number of questions
-            while len(validated_mcq) < 5:
-                validated_mcq.append({
-                    "question": f"Sample question {len(validated_mcq) + 1}",
-                    "options": ["A. Option 1", "B. Option 2", "C. Option 3", "D. Option 4"],
-                    "answer": "A"
-                })
-                
-            while len(validated_desc) < 3:
-                validated_desc.append(f"Describe your relevant experience for this role.")
+            CANDIDATE BACKGROUND:
+            {focus_content}
             
-            state["questions"] = {
-                "mcq_questions": validated_mcq,
-                "desc_questions": validated_desc
-            }
+            ROLE CONTEXT AND REQUIREMENTS:
+            {job_requirements}
             
-        except Exception as e:
-            state["questions"] = {
-                "error": f"Question generation failed: {str(e)}",
-                "fallback": True
-            }
-        
-        return state
-
-    # Build the graph
-    sg = StateGraph(ResumeInterviewState)
-    
-    # Add all agents
-    sg.add_node("content_extraction", content_extraction_agent)
-    sg.add_node("job_requirements_analysis", job_requirements_analysis_agent)
-    sg.add_node("focus_content_processing", focus_content_processing_agent)
-    sg.add_node("gap_analysis_matching", gap_analysis_matching_agent)
-    sg.add_node("strategy_planning", strategy_planning_agent)
-    sg.add_node("question_generation", question_generation_agent)
-    
-    # Define flow
-    sg.set_entry_point("content_extraction")
-    sg.add_edge("content_extraction", "job_requirements_analysis")
-    sg.add_edge("job_requirements_analysis", "focus_content_processing")
-    sg.add_edge("focus_content_processing", "gap_analysis_matching")
-    sg.add_edge("gap_analysis_matching", "strategy_planning")
-    sg.add_edge("strategy_planning", "question_generation")
-    sg.set_finish_point("question_generation")
-    
-    return sg.compile()
-
-
-
-def generate_job_description(target_role: str, experience: str, current_role: str) -> str:
-    """Generate a job description based on target role and experience level."""
-    
-    if "GROQ_API_KEY" not in os.environ:
-        raise RuntimeError("GROQ_API_KEY environment variable is not set.")
+            TARGET ROLE: {target_role}
+            EXPERIENCE: {experience} years
+    """
+}
+_QUESTION_PROMPTS = {k: ChatPromptTemplate.from_template(v) for k, v in _QUESTION_PROMPTS.items()}
 
-    llm = ChatGroq(temperature=0.7, model_name=_resolve_groq_model(), max_tokens=2048)
-    
-    prompt = ChatPromptTemplate.from_template(
-        """
-        Generate a comprehensive job description for the following role:
-        
-        Target Role: {target_role}
-        Experience Level: {experience} years
-        Current Role: {current_role}
+_JOB_DESCRIPTION_PROMPT = ChatPromptTemplate.from_template("""
+        Generate a comprehensive job description for the role described at the end.
         
         Create a realistic and detailed job description that includes:
         1. Job Title and Company Overview
@@ -746,23 +555,349 @@ def generate_job_description(target_role: str, experience: str, current_role: st
         8. Company Culture and Benefits
         
         Make the job description:
-        - Appropriate for the experience level ({experience} years)
-        - Relevant to someone transitioning from {current_role} to {target_role}
-        - Include specific technologies and skills commonly required for {target_role}
+        - Appropriate for the stated experience level
+        - Relevant to someone transitioning from the current role to the target role
+        - Include specific technologies and skills commonly required for the target role
         - Professional and realistic
         - Comprehensive enough to generate meaningful interview questions
         
         Format the output as a well-structured job description.
-        """
+        
+        Target Role: {target_role}
+        Experience Level: {experience} years
+        Current Role: {current_role}
+        """)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    except ImportError:
+        return False
+    return True
+
+
+# One connection pool per process shared by every ChatGroq client, so the agents' calls
+# (and JD generation) reuse the same TLS connection to api.groq.com instead of each
+# client opening its own. With h2 installed, the parallel agents multiplex over HTTP/2.
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=16, keepalive_expiry=60.0)
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+_HTTP_CLIENT = httpx.Client(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT, http2=_http2_available())
+_HTTP_ASYNC_CLIENT = httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT, http2=_http2_available())
+atexit.register(_HTTP_CLIENT.close)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_llm(temperature: float) -> ChatGroq:
+    """Shared ChatGroq client per temperature, built on first use."""
+    if "GROQ_API_KEY" not in os.environ:
+        raise RuntimeError("GROQ_API_KEY environment variable is not set.")
+    return ChatGroq(
+        temperature=temperature,
+        model_name=_resolve_groq_model(),
+        max_tokens=2048,
+        http_client=_HTTP_CLIENT,
+        http_async_client=_HTTP_ASYNC_CLIENT,
     )
+
+
+def _response_cache_key(llm: ChatGroq, prompt_text: str) -> Optional[str]:
+    """Cache key for llm's response to prompt_text, or None if it should not be cached.
+
+    Sampled (temperature > 0) responses are only reused when LLM_CACHE_SEED is set,
+    so repeat sessions keep getting varied questions by default.
+    """
+    seed = os.getenv("LLM_CACHE_SEED", "")
+    if llm.temperature > 0 and not seed:
+        return None
+    return llm_cache.make_key("resume_interview", llm.model_name, llm.temperature, seed, prompt_text)
+
+
+# Groq JSON mode: the response is a bare JSON object, no fences or prose.
+# (Not used with llm.astream, which JSON mode does not support.)
+_JSON_MODE = {"response_format": {"type": "json_object"}}
+
+
+async def _cached_ainvoke(
+    llm: ChatGroq,
+    prompt_text: str,
+    on_mcq: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+) -> str:
+    """Response text for a prompt that asks for a JSON object, served from llm_cache
+    when possible and requested in JSON mode otherwise.
+
+    If on_mcq is given the response is streamed and on_mcq(index, mcq) is called for
+    every MCQ as soon as it has been fully received (cache hits produce no calls).
+    """
+    key = _response_cache_key(llm, prompt_text)
+    cached = llm_cache.cache_get(key) if key else None
+    if cached is not None:
+        return cached
+    if on_mcq is None:
+        result = (await llm.ainvoke(prompt_text, **_JSON_MODE)).content
+    else:
+        result = await _astream_mcqs(llm, prompt_text, on_mcq)
+    if key and _safe_json(result) is not None:
+        llm_cache.cache_put(key, result)
+    return result
+
+
+async def _astream_mcqs(llm: ChatGroq, prompt_text: str, on_mcq: Callable[[int, Dict[str, Any]], None]) -> str:
+    """Stream llm's response, reporting each completed MCQ, and return the full text."""
+    stream_parser = McqStreamParser()
+    chunks = []
+    seen = 0
+    stream = llm.astream(prompt_text)
+    try:
+        async for chunk in stream:
+            chunks.append(chunk.content)
+            for mcq in stream_parser.feed(chunk.content):
+                on_mcq(seen, mcq)
+                seen += 1
+            if stream_parser.closed:
+                # Nothing after the JSON object is used; stop reading
+                break
+    finally:
+        await stream.aclose()
+    return "".join(chunks)
+
+
+async def content_extraction_agent(state: dict):
+    """Agent 1: Extract skills, projects and work experience from the resume."""
+    
+    result = await _cached_ainvoke(_get_llm(0), _CONTENT_EXTRACTION_PROMPT.format(**state))
+    data = _safe_json(result) or {}
+    
+    # Runs in parallel with job_requirements_analysis, so return only the keys it sets
+    return {
+        "extracted_skills": data.get("skills", {}),
+        "extracted_projects": data.get("projects", []),
+        "extracted_work_experience": data.get("work_experience", []),
+    }
+
+
+async def job_requirements_analysis_agent(state: dict):
+    """Agent 2: Analyze the job description to extract its requirements."""
+    
+    result = await _cached_ainvoke(_get_llm(0), _JOB_REQUIREMENTS_PROMPT.format(**state))
+    data = _safe_json(result) or {}
+    
+    return {"job_requirements": data}
+
+
+def focus_content_processing_agent(state: dict):
+    """Agent 3: Process and structure content based on selected focus area."""
+    
+    focus_area = state.get("focus_area", "skills")
+    
+    if focus_area == "skills":
+        state["focus_content"] = {
+            "type": "skills",
+            "content": state.get("extracted_skills", {}),
+            "context": f"Candidate has {state.get('experience', '0')} years of experience"
+        }
+    
+    elif focus_area == "projects":
+        projects = state.get("extracted_projects", [])
+        # Select most relevant projects (max 3-4 for focused questions)
+        selected_projects = projects[:4] if len(projects) > 4 else projects
+        state["focus_content"] = {
+            "type": "projects", 
+            "content": selected_projects,
+            "context": f"Targeting {state.get('target_role', '')} role"
+        }
+    
+    elif focus_area == "work_experience":
+        experience = state.get("extracted_work_experience", [])
+        state["focus_content"] = {
+            "type": "work_experience",
+            "content": experience,
+            "context": f"Transitioning from {state.get('current_role', '')} to {state.get('target_role', '')}"
+        }
+    
+    return state
+
+
+async def gap_strategy_agent(state: dict):
+    """Agent 4: Analyze gaps between resume content and job requirements, and plan the
+    question strategy from that analysis, in a single call."""
+    
+    focus_area = state.get("focus_area")
+    focus_content = state.get("focus_content", {})
+    job_requirements = state.get("job_requirements", {})
     
+    result = await _cached_ainvoke(_get_llm(0), _GAP_STRATEGY_PROMPT.format(
+        focus_area=focus_area,
+        focus_content=json.dumps(focus_content, separators=(",", ":"), ensure_ascii=False),
+        job_requirements=json.dumps(job_requirements, separators=(",", ":"), ensure_ascii=False),
+        target_role=state.get('target_role', ''),
+        experience=state.get('experience', '')
+    ))
+    
+    data = _safe_json(result) or {}
+    state["gap_analysis"] = data.get("gap_analysis", {})
+    state["question_strategy"] = data.get("question_strategy", {})
+    
+    return state
+
+
+_ANSWER_LABELS = frozenset(("A", "B", "C", "D"))
+
+
+async def question_generation_agent(
+    state: dict,
+    on_mcq: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+):
+    """Agent 5: Generate targeted questions based on strategy and focus area."""
+    
+    focus_area = state.get("focus_area")
+    round_str = str(state.get("round", "1")).strip()
     try:
-        result = llm.predict(prompt.format(
+        round_num = int(round_str)
+    except Exception:
+        round_num = 1
+    
+    # Select prompt based on round
+    if round_num == 3:
+        prompt = _QUESTION_PROMPTS["managerial"]
+    elif round_num == 4:
+        prompt = _QUESTION_PROMPTS["hr"]
+    else:
+        # Technical rounds (1 and 2) use existing focus_area mapping
+        prompt = _QUESTION_PROMPTS.get(focus_area, _QUESTION_PROMPTS["skills"])
+    
+    try:
+        result = await _cached_ainvoke(_get_llm(0.7), prompt.format(**state), on_mcq)
+        
+        # Simple JSON parsing with fallback
+        try:
+            fenced = _JSON_FENCE_RE.search(result) or _FENCE_RE.search(result)
+            data = _json_loads(fenced.group(1) if fenced else result)
+        except Exception:
+            # If JSON parsing fails, return error
+            state["questions"] = {
+                "error": "Failed to parse questions from AI response",
+                "raw_response": result[:500]
+            }
+            return state
+
+        # Validate structure
+        if not isinstance(data, dict):
+            state["questions"] = {"error": "Invalid response format"}
+            return state
+            
+        mcq_questions = data.get("mcq_questions", [])
+        desc_questions = data.get("desc_questions", [])
+        
+        # Validate MCQ questions
+        validated_mcq = []
+        for mcq in mcq_questions[:5]:  # Take only first 5
+            if not isinstance(mcq, dict):
+                continue
+            question = mcq.get("question", "").strip()
+            options = mcq.get("options", [])
+            answer = mcq.get("answer", "A").strip().upper()
+            
+            if not question or not options or len(options) != 4:
+                continue
+                
+            if answer not in _ANSWER_LABELS:
+                answer = "A"
+                
+            validated_mcq.append({
+                "question": question,
+                "options": options,
+                "answer": answer
+            })
+        
+        # Validate descriptive questions
+        validated_desc = []
+        for desc in desc_questions[:3]:  # Take only first 3
+            if isinstance(desc, str) and desc.strip():
+                validated_desc.append(desc.strip())
+        
+        # Ensure we have the right number of questions
+        while len(validated_mcq) < 5:
+            validated_mcq.append({
+                "question": f"Sample question {len(validated_mcq) + 1}",
+                "options": ["A. Option 1", "B. Option 2", "C. Option 3", "D. Option 4"],
+                "answer": "A"
+            })
+            
+        while len(validated_desc) < 3:
+            validated_desc.append(f"Describe your relevant experience for this role.")
+        
+        state["questions"] = {
+            "mcq_questions": validated_mcq,
+            "desc_questions": validated_desc
+        }
+        
+    except Exception as e:
+        state["questions"] = {
+            "error": f"Question generation failed: {str(e)}",
+            "fallback": True
+        }
+    
+    return state
+
+
+async def run_pipeline(
+    state: ResumeInterviewState,
+    on_mcq: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    on_stage: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> ResumeInterviewState:
+    """Generate resume-based interview questions: extraction and JD analysis (concurrently)
+    -> focus content -> gap analysis/strategy -> question generation.
+
+    If on_mcq is given, question generation is streamed and on_mcq(index, mcq) is
+    invoked for every raw MCQ as soon as it has been fully received.
+    If on_stage is given, on_stage(stage, data) is invoked with the intermediate
+    results as the analysis stages complete.
+    """
+    state = ResumeInterviewState(**state)
+    for update in await asyncio.gather(content_extraction_agent(state), job_requirements_analysis_agent(state)):
+        state.update(update)
+    focus_content_processing_agent(state)
+    if on_stage:
+        on_stage("content_analyzed", {
+            "focus_content": state.get("focus_content", {}),
+            "job_requirements": state.get("job_requirements", {}),
+        })
+    await gap_strategy_agent(state)
+    if on_stage:
+        on_stage("gap_analyzed", {
+            "gap_analysis": state.get("gap_analysis", {}),
+            "question_strategy": state.get("question_strategy", {}),
+        })
+    return await question_generation_agent(state, on_mcq)
+
+
+# A generated JD only feeds the analysis agents (it is not returned), so one per
+# role/experience/current-role is reused for this long regardless of temperature
+_JOB_DESCRIPTION_TTL = 30 * 24 * 3600
+
+
+def generate_job_description(target_role: str, experience: str, current_role: str) -> str:
+    """Generate a job description based on target role and experience level."""
+    
+    llm = _get_llm(0.7)
+    
+    try:
+        key = llm_cache.make_key(
+            "job_description", llm.model_name,
+            target_role.strip().lower(), str(experience).strip(), current_role.strip().lower(),
+        )
+        cached = llm_cache.cache_get(key, max_age=_JOB_DESCRIPTION_TTL)
+        if cached is not None:
+            return cached
+        result = llm.invoke(_JOB_DESCRIPTION_PROMPT.format(
             target_role=target_role,
             experience=experience,
             current_role=current_role
-        ))
-        return result.strip()
+        )).content.strip()
+        if result:
+            llm_cache.cache_put(key, result)
+        return result
     except Exception as e:
         # Fallback job description if generation fails
         return f"""
@@ -788,6 +923,18 @@ We offer competitive compensation, comprehensive benefits, and opportunities for
         """.strip()
 
 
+async def _run_and_close(
+    state: ResumeInterviewState,
+    on_mcq: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    on_stage: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> ResumeInterviewState:
+    """run_pipeline, closing the async pool on the loop it was bound to."""
+    try:
+        return await run_pipeline(state, on_mcq, on_stage)
+    finally:
+        await _HTTP_ASYNC_CLIENT.aclose()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Generate resume-based interview questions using multi-agent system")
     parser.add_argument("--session_id", required=True)
@@ -801,9 +948,22 @@ def main():
                        choices=["skills", "projects", "work_experience"],
                        help="Interview focus area")
     parser.add_argument("--round", default="1", help="Interview round number (for compatibility)")
+    parser.add_argument("--stream", action="store_true", help="Emit a JSON line per completed stage and per MCQ as they are generated, before the final payload")
     
     args = parser.parse_args()
 
+    on_mcq = on_stage = None
+    if args.stream:
+        def on_stage(stage: str, data: Dict[str, Any]) -> None:
+            _write_json({"session_id": args.session_id, "stage": stage, "data": data})
+
+        # Partial lines carry only the question text; the validated options and answers
+        # are only part of the final payload so the two can never disagree.
+        def on_mcq(index: int, mcq: Dict[str, Any]) -> None:
+            question = str(mcq.get("question", "")).strip() if isinstance(mcq, dict) else ""
+            if question:
+                _write_json({"session_id": args.session_id, "partial": {"index": index, "question": question}})
+
     # Handle job description generation if needed
     job_desc = args.job_desc
     if args.job_desc_option == "generate" or not job_desc.strip():
@@ -814,11 +974,9 @@ def main():
                 current_role=args.current_role
             )
         except Exception as e:
-            print(json.dumps({"error": f"Failed to generate job description: {str(e)}"}))
+            _write_json({"error": f"Failed to generate job description: {str(e)}"})
             raise
     
-    # Build graph and initialize state
-    graph = build_resume_interview_graph()
     init_state = {
         "resume_text": args.resume_text,
         "job_desc": job_desc,
@@ -830,7 +988,7 @@ def main():
     }
 
     try:
-        final_state = graph.invoke(init_state)
+        final_state = asyncio.run(_run_and_close(init_state, on_mcq, on_stage))
         questions = final_state.get("questions", {})
         
         payload = {
@@ -838,9 +996,9 @@ def main():
             "focus_area": args.focus_area,
             "questions": questions,
         }
-        print(json.dumps(payload))
+        _write_json(payload)
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        _write_json({"error": str(e)})
         raise
 
 
@@ -4,6 +4,8 @@
 # In[2]:
 
 
+import asyncio
+import importlib.util
 import os
 import json
 import re
@@ -14,7 +16,7 @@ from typing import TypedDict, List, Optional
 try:
     from langchain_core.prompts import ChatPromptTemplate
     from langchain_core.output_parsers import StrOutputParser
-    from langgraph.graph import StateGraph, END
+    from langgraph.graph import StateGraph, START, END
 except ImportError as e:
     # If crucial LangChain bits are missing, print a clear message and exit
     print(f"❌ Missing LangChain dependency: {e}", file=sys.stderr, flush=True)
@@ -22,20 +24,62 @@ except ImportError as e:
     sys.exit(1)
 
 # --- Import ChatOpenAI with fallback for different LangChain versions ---
+# Probe with find_spec so the choice costs no failed imports. langchain_community is
+# tried first: langchain.chat_models only re-exports it behind a deprecation warning.
 try:
-    from langchain.chat_models import ChatOpenAI  # Newer versions
-except ImportError:
-    try:
-        from langchain_community.chat_models import ChatOpenAI  # Older versions
-    except ImportError as e:
-        print(f"❌ Cannot import ChatOpenAI: {e}", file=sys.stderr, flush=True)
-        print("👉 Make sure 'langchain' is installed and up to date.", file=sys.stderr, flush=True)
-        sys.exit(1)
+    if importlib.util.find_spec("langchain_community") is not None:
+        from langchain_community.chat_models import ChatOpenAI
+    else:
+        from langchain.chat_models import ChatOpenAI  # Older versions
+except ImportError as e:
+    print(f"❌ Cannot import ChatOpenAI: {e}", file=sys.stderr, flush=True)
+    print("👉 Make sure 'langchain' is installed and up to date.", file=sys.stderr, flush=True)
+    sys.exit(1)
 
 # Ensure UTF-8 encoding for stdout to avoid UnicodeEncodeError on Windows
 if sys.version_info >= (3, 7):
     sys.stdout.reconfigure(encoding='utf-8')
 
+# Start of a JSON array of objects, e.g. "[\n  {"
+_ARRAY_OF_OBJECTS_START_RE = re.compile(r"\[\s*\{")
+
+
+def _slice_first_json(s, open_ch, close_ch):
+    """Return the first balanced open_ch...close_ch span of s, or None.
+
+    A single forward pass tracking nesting depth; brackets inside JSON strings are
+    ignored. Arrays must start with an object ("[{"), as the extractors expect.
+    """
+    if open_ch == "[":
+        m = _ARRAY_OF_OBJECTS_START_RE.search(s)
+        start = m.start() if m else -1
+    else:
+        start = s.find(open_ch)
+    if start < 0:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(s)):
+        ch = s[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == open_ch:
+            depth += 1
+        elif ch == close_ch:
+            depth -= 1
+            if depth == 0:
+                return s[start:i + 1]
+    return None
+
+
 class ResumeAnalyzer:
     def __init__(self, groq_api_key: str):
         """Initialize the Resume Analyzer with Groq API key"""
@@ -214,60 +258,60 @@ class ResumeAnalyzer:
         work_experience_rewrite_chain = work_experience_rewrite_prompt | self.llm | StrOutputParser()
         project_rewrite_chain = projects_rewrite_prompt | self.llm | StrOutputParser()
 
-        # Define node functions
-        def extract_projects_node(state):
-            response = project_extraction_chain.invoke({"resume_text": state["resume_text"]})
-            json_match = re.search(r"\[\s*{.*?}\s*\]", response, re.DOTALL)
-            projects = json.loads(json_match.group(0)) if json_match else []
+        # Define node functions; async so independent branches overlap their Groq calls
+        async def extract_projects_node(state):
+            response = await project_extraction_chain.ainvoke({"resume_text": state["resume_text"]})
+            json_text = _slice_first_json(response, "[", "]")
+            projects = json.loads(json_text) if json_text else []
             return {"projects_json": projects}
 
-        def extract_skills_node(state):
-            response = skill_extraction_chain.invoke({"resume_text": state["resume_text"]})
-            match = re.search(r"\{.*\}", response, re.DOTALL)
-            skills_json = json.loads(match.group(0)) if match else {"skills": []}
+        async def extract_skills_node(state):
+            response = await skill_extraction_chain.ainvoke({"resume_text": state["resume_text"]})
+            json_text = _slice_first_json(response, "{", "}")
+            skills_json = json.loads(json_text) if json_text else {"skills": []}
             return {"skills_list": skills_json["skills"]}
 
-        def extract_work_experience_node(state):
-            response = work_experience_chain.invoke({"resume_text": state["resume_text"]})
-            match = re.search(r"\[\s*{.*?}\s*\]", response, re.DOTALL)
-            work_exps = json.loads(match.group(0)) if match else []
+        async def extract_work_experience_node(state):
+            response = await work_experience_chain.ainvoke({"resume_text": state["resume_text"]})
+            json_text = _slice_first_json(response, "[", "]")
+            work_exps = json.loads(json_text) if json_text else []
             return {"work_experience_list": work_exps}
 
-        def skills_match_node(state):
-            response = skills_match_chain.invoke({
+        async def skills_match_node(state):
+            response = await skills_match_chain.ainvoke({
                 "skills": state["skills_list"],
                 "jd": state["job_description"],
                 "target_role": state["target_role"]
             })
             return {"skills_match_report": response}
 
-        def role_relevance_node(state):
-            response = role_relevance_chain.invoke({
+        async def role_relevance_node(state):
+            response = await role_relevance_chain.ainvoke({
                 "current_role": state["current_role"],
                 "target_role": state["target_role"]
             })
             return {"role_relevance_report": response}
 
-        def work_experience_agent(state):
+        async def work_experience_agent(state):
             work_exp = state.get("work_experience_list", [])
             jd = state.get("job_description", "")
             target = state.get("target_role", "")
             
-            formatted_exp = json.dumps(work_exp, indent=2)
-            response = work_experience_rewrite_chain.invoke({
+            formatted_exp = json.dumps(work_exp, separators=(",", ":"), ensure_ascii=False)
+            response = await work_experience_rewrite_chain.ainvoke({
                 "jd": jd,
                 "target_role": target,
                 "work_experience": formatted_exp
             })
             return {"work_experience_report": response}
 
-        def projects_agent(state):
+        async def projects_agent(state):
             projects = state.get("projects_json", [])
             jd = state.get("job_description", "")
             target = state.get("target_role", "")
             
-            formatted_projects = json.dumps(projects, indent=2)
-            response = project_rewrite_chain.invoke({
+            formatted_projects = json.dumps(projects, separators=(",", ":"), ensure_ascii=False)
+            response = await project_rewrite_chain.ainvoke({
                 "jd": jd,
                 "target_role": target,
                 "projects": formatted_projects
@@ -324,19 +368,22 @@ class ResumeAnalyzer:
         builder.add_node("work_experience_agent", work_experience_agent)
         builder.add_node("generate_final_report", generate_final_report_node)
 
-        # Set entry point
-        builder.set_entry_point("extract_projects")
+        # Set entry points: the extractors and role relevance only read the raw inputs,
+        # so they all start right away
+        builder.add_edge(START, "extract_projects")
+        builder.add_edge(START, "extract_skills")
+        builder.add_edge(START, "extract_work_experience")
+        builder.add_edge(START, "role_relevance")
 
         # Define edges
-        builder.add_edge("extract_projects", "extract_skills")
-        builder.add_edge("extract_projects", "extract_work_experience")
         builder.add_edge("extract_projects", "projects_agent")
         builder.add_edge("extract_work_experience", "work_experience_agent")
         builder.add_edge("extract_skills", "skills_match")
-        builder.add_edge("skills_match", "role_relevance")
-        builder.add_edge("role_relevance", "generate_final_report")
-        builder.add_edge("projects_agent", "generate_final_report")
-        builder.add_edge("work_experience_agent", "generate_final_report")
+        # Wait for every branch so the report is assembled once, with all sections
+        builder.add_edge(
+            ["skills_match", "role_relevance", "projects_agent", "work_experience_agent"],
+            "generate_final_report",
+        )
 
         # Set final node
         builder.set_finish_point("generate_final_report")
@@ -363,13 +410,13 @@ class ResumeAnalyzer:
         
         try:
             # Run the graph
-            final_state = self.graph.invoke({
+            final_state = asyncio.run(self.graph.ainvoke({
                 "resume_text": resume_text,
                 "job_description": job_description,
                 "current_role": current_role,
                 "target_role": target_role,
                 "experience": experience
-            })
+            }))
             
             return final_state.get("final_markdown_report", "Error generating report")
             
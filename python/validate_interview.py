@@ -1,28 +1,94 @@
 import argparse
+import functools
 import json
 import os
 import sys
 import re
 from typing import Dict, List, Any, Tuple
 
+import groq
 from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate
 
+_MODEL_ALIASES = {
+    "llama3-70b-8192": "llama-3.3-70b-versatile",
+    "llama3-8b-8192": "llama-3.1-8b-instant",
+    "llama3-70b": "llama-3.3-70b-versatile",
+    "llama3-8b": "llama-3.1-8b-instant",
+}
+
+
 def _resolve_groq_model() -> str:
     """Resolve a supported Groq model, remapping deprecated names if needed.
     Honors GROQ_MODEL env var and defaults to a current model if not set.
     """
-    alias_map = {
-        "llama3-70b-8192": "llama-3.1-70b-versatile",
-        "llama3-8b-8192": "llama-3.1-8b-instant",
-        "llama3-70b": "llama-3.1-70b-versatile",
-        "llama3-8b": "llama-3.1-8b-instant",
-    }
     env_model = os.getenv("GROQ_MODEL")
     if env_model:
-        return alias_map.get(env_model, env_model)
+        return _MODEL_ALIASES.get(env_model, env_model)
     return "llama-3.1-8b-instant"
 
+
+@functools.lru_cache(maxsize=None)
+def _get_llm(model_name: str) -> ChatGroq:
+    """Return a process-wide ChatGroq client for model_name."""
+    # Ensure the API key is set
+    if "GROQ_API_KEY" not in os.environ:
+        raise RuntimeError("GROQ_API_KEY environment variable is not set.")
+    return ChatGroq(
+        temperature=0.2,
+        model_name=model_name,
+        max_tokens=2048,
+        # Groq JSON mode: the evaluation prompt asks for a single JSON object
+        model_kwargs={"response_format": {"type": "json_object"}},
+    )
+
+
+# Prompt for evaluation with explicit relevance gating and structured rubric,
+# compiled once at import rather than for every answer. The rubric is a fixed prefix
+# and the question/answer come last, so provider-side prefix caching can reuse it.
+_EVALUATION_PROMPT = ChatPromptTemplate.from_template(
+    """
+    You are an expert interviewer STRICTLY evaluating how well an answer addresses the SPECIFIC question.
+    Score only for content that is relevant and correct for THIS question.
+    The question and the candidate's answer are given at the end.
+
+    EVALUATION STEPS:
+    1) Identify the key requirements of the question (short bullet list).
+    2) Identify the main claims/points made in the answer (short bullet list).
+    3) Determine relevance: the proportion of answer points that directly address the question's key requirements.
+       - Output a numeric relevance value in [0,1]. If relevance < 0.4, the answer is considered off-topic.
+    4) Determine correctness: for the relevant parts only, how accurate/appropriate are they (in [0,1]).
+    5) Assign the final score in [0,1,2,3] using this STRICT rubric:
+       - If relevance < 0.4: score = 0 (off-topic or mostly irrelevant).
+       - Else if relevance < 0.7: score ∈ [1,2] depending on correctness (<=0.5 -> 1, >0.5 -> 2).
+       - Else (relevance >= 0.7): score ∈ [2,3] depending on correctness (<=0.6 -> 2, >0.6 -> 3).
+
+    IMPORTANT:
+    - If the answer is empty, only punctuation/symbols (e.g., "..."), repeated characters, or obvious gibberish,
+      set relevance = 0 and score = 0.
+
+    STYLE REQUIREMENT FOR FEEDBACK:
+    - Write feedback in SECOND PERSON (use "you").
+    - Be concise, professional, and point out missing key points explicitly.
+
+    OUTPUT STRICT JSON ONLY with this structure:
+    {{
+      "score": <0|1|2|3>,
+      "relevance": <float 0..1>,
+      "feedback": "<second-person feedback>",
+      "reasoning": {{
+        "question_points": ["..."],
+        "answer_points": ["..."],
+        "matched_points": ["..."],
+        "missing_points": ["..."]
+      }}
+    }}
+
+    Question: {question}
+    Candidate's Answer: {answer}
+    """
+)
+
 def validate_mcq_answers(user_answers: Dict[str, str], correct_answers: List[Dict]) -> Tuple[int, int, List[Dict]]:
     """
     Validate MCQ answers and calculate score.
@@ -79,11 +145,7 @@ def validate_descriptive_answers(user_answers: Dict[str, str], questions: List[s
     Returns:
         Tuple containing (score, max_possible_score, detailed_results)
     """
-    # Ensure the API key is set
-    if "GROQ_API_KEY" not in os.environ:
-        raise RuntimeError("GROQ_API_KEY environment variable is not set.")
-    
-    llm = ChatGroq(temperature=0.2, model_name=_resolve_groq_model(), max_tokens=2048)
+    llm = _get_llm(_resolve_groq_model())
     
     max_score = len(questions) * 3  # Each question is worth 3 points
     detailed_results = []
@@ -168,59 +230,12 @@ def validate_descriptive_answers(user_answers: Dict[str, str], questions: List[s
             })
             continue
         
-        # Create prompt for evaluation with explicit relevance gating and structured rubric
-        prompt = ChatPromptTemplate.from_template(
-            """
-            You are an expert interviewer STRICTLY evaluating how well an answer addresses the SPECIFIC question.
-            Score only for content that is relevant and correct for THIS question.
-
-            Question: {question}
-            Candidate's Answer: {answer}
-
-            EVALUATION STEPS:
-            1) Identify the key requirements of the question (short bullet list).
-            2) Identify the main claims/points made in the answer (short bullet list).
-            3) Determine relevance: the proportion of answer points that directly address the question's key requirements.
-               - Output a numeric relevance value in [0,1]. If relevance < 0.4, the answer is considered off-topic.
-            4) Determine correctness: for the relevant parts only, how accurate/appropriate are they (in [0,1]).
-            5) Assign the final score in [0,1,2,3] using this STRICT rubric:
-               - If relevance < 0.4: score = 0 (off-topic or mostly irrelevant).
-               - Else if relevance < 0.7: score ∈ [1,2] depending on correctness (<=0.5 -> 1, >0.5 -> 2).
-               - Else (relevance >= 0.7): score ∈ [2,3] depending on correctness (<=0.6 -> 2, >0.6 -> 3).
-
-            IMPORTANT:
-            - If the answer is empty, only punctuation/symbols (e.g., "..."), repeated characters, or obvious gibberish,
-              set relevance = 0 and score = 0.
-
-            STYLE REQUIREMENT FOR FEEDBACK:
-            - Write feedback in SECOND PERSON (use "you").
-            - Be concise, professional, and point out missing key points explicitly.
-
-            OUTPUT STRICT JSON ONLY with this structure:
-            {{
-              "score": <0|1|2|3>,
-              "relevance": <float 0..1>,
-              "feedback": "<second-person feedback>",
-              "reasoning": {{
-                "question_points": ["..."],
-                "answer_points": ["..."],
-                "matched_points": ["..."],
-                "missing_points": ["..."]
-              }}
-            }}
-            """
-        )
-        
-        prompt_text = prompt.format(question=question, answer=user_answer)
-        result = llm.predict(prompt_text)
+        prompt_text = _EVALUATION_PROMPT.format(question=question, answer=user_answer)
+        result = ""
         
         try:
-            # Extract JSON from the result if needed
-            if "```" in result:
-                result = result.split("```")[1].strip()
-                if result.startswith("json"):
-                    result = result[4:].strip()
-            
+            # JSON mode returns the bare object; Groq rejects output that is not valid JSON
+            result = llm.invoke(prompt_text).content
             evaluation = json.loads(result)
             # Pull fields with defaults
             score = int(evaluation.get("score", 0))
@@ -256,7 +271,7 @@ def validate_descriptive_answers(user_answers: Dict[str, str], questions: List[s
                 "llm_raw": evaluation
             })
             
-        except (json.JSONDecodeError, ValueError) as e:
+        except (groq.BadRequestError, json.JSONDecodeError, ValueError) as e:
             # Fallback if parsing fails
             detailed_results.append({
                 "question": question,
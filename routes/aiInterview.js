@@ -91,11 +91,11 @@ router.post('/start', upload.single('resume'), async (req, res) => {
 
     // Call Python script with proper path
     const scriptPath = path.resolve(__dirname, '../python/ai_interview.py');
+    // Resume and JD text go over stdin: multi-KB values would otherwise bloat argv
     const pythonArgs = [
       scriptPath,
+      '--stdin',
       '--session_id', sessionId,
-      '--resume_text', extractedText,
-      '--job_desc', jobDescription || '',
       '--job_desc_option', jobDescriptionOption || 'paste',
       '--current_role', currentRole,
       '--target_role', targetRole,
@@ -106,10 +106,17 @@ router.post('/start', upload.single('resume'), async (req, res) => {
       pythonArgs.push('--prev_used_hard', prevUsedHardTopicsArg);
     }
     const pythonProcess = spawn('python', pythonArgs);
+    pythonProcess.stdin.on('error', () => { /* process exited early; reported via 'close' */ });
+    pythonProcess.stdin.end(JSON.stringify({
+      resume_text: extractedText,
+      job_desc: jobDescription || ''
+    }));
 
     let pythonOutput = '';
     let pythonError = '';
 
+    // Decode as a stream so multi-byte UTF-8 characters split across chunks survive
+    pythonProcess.stdout.setEncoding('utf8');
     pythonProcess.stdout.on('data', (data) => {
       pythonOutput += data.toString();
     });
@@ -146,6 +153,22 @@ router.post('/start', upload.single('resume'), async (req, res) => {
       console.log('[AIInterview] Python exit code:', code);
 
       if (responded || res.headersSent) return; // already handled (e.g., timeout)
+      if (code === 2) {
+        // Exit 2 means the inputs were rejected before any Groq call; the last stdout line says why
+        let rejection = null;
+        try {
+          rejection = JSON.parse(output.split('\n').pop());
+        } catch (_e) {
+          // not the invalid_input payload; fall through to the generic failure
+        }
+        if (rejection && rejection.error === 'invalid_input') {
+          return safeJson(400, {
+            error: 'Invalid input',
+            field: rejection.field,
+            details: rejection.message
+          });
+        }
+      }
       if (code !== 0) {
         return safeJson(500, {
           error: 'Python script failed',
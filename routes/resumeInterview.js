@@ -109,6 +109,8 @@ router.post('/start', upload.single('resume'), async (req, res) => {
         let pythonOutput = '';
         let pythonError = '';
 
+        // Decode as a stream so multi-byte UTF-8 characters split across chunks survive
+        pythonProcess.stdout.setEncoding('utf8');
         pythonProcess.stdout.on('data', (data) => {
             pythonOutput += data.toString();
         });
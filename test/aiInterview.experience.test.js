@@ -0,0 +1,45 @@
+import { spawnSync } from 'child_process';
+import path from 'path';
+import { fileURLToPath } from 'url';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+const scriptPath = path.resolve(__dirname, '../python/ai_interview.py');
+
+// Runs ai_interview.py the way routes/aiInterview.js does. The pasted job description is
+// too short on purpose, so every run stops at input validation before any Groq call.
+const runWithExperience = (experience) => {
+    const result = spawnSync('python', [
+        scriptPath,
+        '--stdin',
+        '--session_id', 'test-session',
+        '--job_desc_option', 'paste',
+        '--current_role', 'Developer',
+        '--target_role', 'Senior Developer',
+        `--experience=${experience}`,
+        '--round', '1'
+    ], {
+        input: JSON.stringify({ resume_text: 'resume text', job_desc: 'short' }),
+        encoding: 'utf8',
+        env: { ...process.env, GROQ_API_KEY: process.env.GROQ_API_KEY || 'test-key' }
+    });
+    return { code: result.status, payload: JSON.parse(result.stdout.trim().split('\n').pop()) };
+};
+
+describe('ai_interview.py experience validation', () => {
+    it.each(['3', '3.5', '10+', '3 years', '0-1', '<1', 'Fresher', ''])(
+        'accepts experience %p as forwarded by the route',
+        (experience) => {
+            const { code, payload } = runWithExperience(experience);
+            // Validation moves on to the job description, which is the field rejected here
+            expect(code).toBe(2);
+            expect(payload).toMatchObject({ error: 'invalid_input', field: 'job_desc' });
+        }
+    );
+
+    it.each(['-2', '150'])('rejects experience %p with exit code 2', (experience) => {
+        const { code, payload } = runWithExperience(experience);
+        expect(code).toBe(2);
+        expect(payload).toMatchObject({ error: 'invalid_input', field: 'experience' });
+    });
+});